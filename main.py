@@ -11,21 +11,36 @@ import sys
 import json
 import math
 from enum import Enum
+from collections import deque
 from dataclasses import dataclass
 import base64
+import struct
+import zlib
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+
+import numpy as np
+
+import pixel_ops
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QToolBar, QColorDialog, QFileDialog, QSpinBox,
     QLabel, QSlider, QPushButton, QListWidget, QListWidgetItem,
     QMenu,QScrollArea, QGridLayout, QButtonGroup, QToolButton, QMessageBox,
-    QCheckBox, QTextEdit, QDialog, QDialogButtonBox, QInputDialog
+    QCheckBox, QTextEdit, QDialog, QDialogButtonBox, QInputDialog,
+    QStyleFactory
+)
+from PyQt6 import sip
+from PyQt6.QtCore import (
+    Qt, QPoint, QRect, QSize, QLineF, QTimer, QSignalBlocker,
+    pyqtSignal, QBuffer, QIODevice
 )
-from PyQt6.QtCore import Qt, QPoint, QRect, QSize, pyqtSignal, QBuffer, QIODevice
 from PyQt6.QtGui import (
     QPainter, QPixmap, QColor, QPen, QBrush, QImage, QIcon,
     QFont, QAction, QKeySequence,
-    QPolygon, QTransform
+    QPolygon, QTransform, QPalette
 )
 
 # Konstanten
@@ -36,6 +51,14 @@ MAX_GRID_SIZE = 256
 MAX_UNDO_STEPS = 100
 SETTINGS_FILE = "pixel_editor_settings.json"
 
+# Einmal geparste Tastenkürzel; jeder String durchläuft den
+# QKeySequence-Parser genau einmal pro Prozess
+SHORTCUT_ROTATE_CW = QKeySequence("Ctrl+R")
+SHORTCUT_ROTATE_CCW = QKeySequence("Ctrl+Shift+R")
+SHORTCUT_FLIP_H = QKeySequence("Ctrl+H")
+SHORTCUT_FLIP_V = QKeySequence("Ctrl+Shift+H")
+SHORTCUT_MERGE = QKeySequence("Ctrl+E")
+
 
 def load_icon(icon_name, fallback_text="?"):
     """Lädt ein Icon aus Datei oder gibt Fallback-Text zurück"""
@@ -45,6 +68,26 @@ def load_icon(icon_name, fallback_text="?"):
     return None
 
 
+@lru_cache(maxsize=32)
+def _glyph_icon(glyph):
+    """Fallback-Glyphe einmal in ein gecachtes QIcon rendern
+
+    Die Tool-Buttons teilen sich so pro Glyphe ein fertig gerastertes
+    Pixmap, statt dass Qt den (teils Emoji-)Text bei jedem Paint neu
+    durchs Text-Shaping schickt.
+    """
+    pixmap = QPixmap(24, 24)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pixmap)
+    font = QFont()
+    font.setPixelSize(18)
+    painter.setFont(font)
+    painter.setPen(QApplication.palette().color(QPalette.ColorRole.ButtonText))
+    painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, glyph)
+    painter.end()
+    return QIcon(pixmap)
+
+
 class IconToolButton(QToolButton):
     def __init__(self, icon_name, fallback_text, tooltip=""):
         super().__init__()
@@ -55,11 +98,9 @@ class IconToolButton(QToolButton):
             self.setIcon(icon)
             self.setIconSize(QSize(24, 24))
         else:
-            # Fallback zu Text/Emoji
-            self.setText(fallback_text)
-            font = QFont()
-            font.setPixelSize(18)
-            self.setFont(font)
+            # Fallback zu Text/Emoji, vorgerendert und geteilt
+            self.setIcon(_glyph_icon(fallback_text))
+            self.setIconSize(QSize(24, 24))
 
         self.setToolTip(tooltip)
         self.setFixedSize(ICON_SIZE, ICON_SIZE)
@@ -83,43 +124,202 @@ class DrawMode(Enum):
     MOVE = "move"
 
 
+def pack_premultiplied(color):
+    """QColor als premultiplizierten uint32-ARGB-Wert für die Ebenenpuffer packen"""
+    alpha = color.alpha()
+    return np.uint32(
+        (alpha << 24)
+        | ((color.red() * alpha // 255) << 16)
+        | ((color.green() * alpha // 255) << 8)
+        | (color.blue() * alpha // 255)
+    )
+
+
+@lru_cache(maxsize=256)
+def palette_color(spec):
+    """QColor für einen Hex-String, gecacht
+
+    Paletten-Importe (auch der beim Programmstart aus den Settings)
+    greifen auf dieselben QColor-Instanzen zurück, statt pro Aufruf
+    Dutzende neue Wrapper anzulegen.
+    """
+    return QColor(spec)
+
+
+@lru_cache(maxsize=16)
+def _load_palette_file(path, mtime):
+    """Paletten-JSON laden, gecacht nach (Pfad, mtime)
+
+    Lädt der Benutzer dieselbe unveränderte Datei erneut, kommt die
+    Farbliste aus dem Cache; eine geänderte Datei hat eine neue mtime
+    und wird frisch geparst.
+    """
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
 @dataclass
 class Layer:
     name: str
-    pixmap: QPixmap
+    data: np.ndarray  # uint32 (H, W), premultipliziertes ARGB
     visible: bool = True
     opacity: float = 1.0
     selected: bool = False  # For merge selection
 
-    def to_dict(self):
-        # Convert pixmap to base64
-        buffer = QBuffer()
-        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
-        self.pixmap.save(buffer, "PNG")
-        image_data = base64.b64encode(buffer.data()).decode()
-        buffer.close()
+    def __post_init__(self):
+        self.epoch = 0  # zählt Pixel-Änderungen, für billige Vergleiche
+        self._bbox_epoch = -1
+        self._bbox_cache = None
+        self._thumb_key = None
+        self._thumb_cache = None
+        self._pixmap_opacity = None
+        self.replace_data(self.data)
+
+    def replace_data(self, data):
+        """Neuen Pixelpuffer übernehmen und die QImage-Ansicht neu aufbauen"""
+        height, width = data.shape
+        # Das ndarray ist eine View auf die Bits der QImage - Kernel-Writes
+        # und QPainter-Zeichnungen landen im selben Puffer
+        self.qimage = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+        bits = self.qimage.bits()
+        bits.setsize(self.qimage.sizeInBytes())
+        view = np.frombuffer(bits, dtype=np.uint32).reshape(height, width)
+        view[:] = data
+        self.data = view
+        self._pixmap_cache = None
 
-        return {
-            'name': self.name,
-            'image_data': image_data,
-            'visible': self.visible,
-            'opacity': self.opacity
-        }
+    @classmethod
+    def create(cls, name, size, **kwargs):
+        """Neue, vollständig transparente Ebene der Grösse size x size"""
+        return cls(name, np.zeros((size, size), dtype=np.uint32), **kwargs)
+
+    @classmethod
+    def from_image(cls, name, image, **kwargs):
+        """Ebene aus einer beliebigen QImage erzeugen (kopiert die Pixel)"""
+        converted = image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+        bits = converted.bits()
+        bits.setsize(converted.sizeInBytes())
+        data = np.frombuffer(bits, dtype=np.uint32).reshape(
+            converted.height(), converted.width()
+        ).copy()
+        return cls(name, data, **kwargs)
+
+    @property
+    def pixmap(self):
+        """QPixmap zum Zeichnen, Deckkraft bereits eingerechnet
+
+        Wird nur nach Pixel- oder Deckkraft-Änderungen neu erzeugt; der
+        Composite-Blit kommt dadurch ohne setOpacity aus und bleibt auf
+        Qts schnellem premultiplied-Over-Pfad.
+        """
+        if self._pixmap_cache is None or self._pixmap_opacity != self.opacity:
+            if self.opacity >= 1.0:
+                # Von einer Kopie erzeugen: fromImage teilt den Bildpuffer
+                # sonst copy-on-write, und der nächste Schreibzugriff würde
+                # das QImage vom NumPy-View in self.data abkoppeln
+                self._pixmap_cache = QPixmap.fromImage(self.qimage.copy())
+            else:
+                # Deckkraft in alle vier premultiplizierten Kanäle falten
+                op = int(self.opacity * 255)
+                src = self.data
+                scaled = (
+                    (((src >> 24) & 0xFF) * op // 255 << 24)
+                    | (((src >> 16) & 0xFF) * op // 255 << 16)
+                    | (((src >> 8) & 0xFF) * op // 255 << 8)
+                    | ((src & 0xFF) * op // 255)
+                ).astype(np.uint32)
+                height, width = scaled.shape
+                image = QImage(width, height,
+                               QImage.Format.Format_ARGB32_Premultiplied)
+                bits = image.bits()
+                bits.setsize(image.sizeInBytes())
+                np.frombuffer(bits, dtype=np.uint32).reshape(height, width)[:] = scaled
+                self._pixmap_cache = QPixmap.fromImage(image)
+            self._pixmap_opacity = self.opacity
+        return self._pixmap_cache
+
+    def mark_dirty(self):
+        """Nach jedem Schreibzugriff aufrufen - verwirft den Pixmap-Cache"""
+        self._pixmap_cache = None
+        self.epoch += 1
+
+    def thumbnail(self, source):
+        """32x32-Vorschaubild des Bereichs source für die Ebenenliste
+
+        Gecacht pro Epoche - update_layers_list skaliert so nicht bei
+        jedem Aufruf die volle Ebene neu.
+        """
+        key = (self.epoch, source.x(), source.y(),
+               source.width(), source.height())
+        if self._thumb_key != key:
+            scaled = self.qimage.copy(source).scaled(
+                32, 32,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation
+            )
+            self._thumb_cache = QPixmap.fromImage(scaled)
+            self._thumb_key = key
+        return self._thumb_cache
+
+    def content_bbox(self):
+        """Bounding-Box der belegten Pixel als QRect, None wenn leer
+
+        Wird pro Epoche gecacht - zwei vektorisierte any()-Durchläufe
+        statt eines Scans pro Aufruf.
+        """
+        if self._bbox_epoch != self.epoch:
+            rows = np.flatnonzero(self.data.any(axis=1))
+            if rows.size:
+                cols = np.flatnonzero(self.data.any(axis=0))
+                self._bbox_cache = QRect(int(cols[0]), int(rows[0]),
+                                         int(cols[-1]) - int(cols[0]) + 1,
+                                         int(rows[-1]) - int(rows[0]) + 1)
+            else:
+                self._bbox_cache = None
+            self._bbox_epoch = self.epoch
+        return self._bbox_cache
 
     @classmethod
     def from_dict(cls, data):
+        """Ebene aus einem Legacy-JSON-Projekt (vor dem Zip-Container)"""
+        if 'raw_data' in data:
+            arr = np.frombuffer(
+                zlib.decompress(base64.b64decode(data['raw_data'])), dtype=np.uint32
+            ).reshape(data['height'], data['width']).copy()
+            return cls(data['name'], arr,
+                       visible=data['visible'], opacity=data['opacity'])
+
+        # Ältere Projektdateien: PNG + Base64
         image_data = base64.b64decode(data['image_data'])
-        pixmap = QPixmap()
-        pixmap.loadFromData(image_data)
+        image = QImage()
+        image.loadFromData(image_data)
 
-        return cls(
-            name=data['name'],
-            pixmap=pixmap,
+        return cls.from_image(
+            data['name'],
+            image,
             visible=data['visible'],
             opacity=data['opacity']
         )
 
 
+@dataclass
+class UndoFrame:
+    """Ein Undo-Schritt als komprimierte Differenz zweier Zustände
+
+    deltas enthält pro Ebene entweder None (unverändert) oder
+    ((y0, x0, y1, x1), blob) - die XOR-Differenz der Bounding-Box,
+    zlib-komprimiert. XOR ist symmetrisch, derselbe Blob trägt also
+    sowohl Undo als auch Redo. Ändert sich die Ebenenstruktur (Anzahl
+    oder Grösse), ist deltas None und before_full/after_full halten
+    komplette komprimierte Schnappschüsse.
+    """
+    before_meta: list
+    after_meta: list
+    deltas: list = None
+    before_full: list = None
+    after_full: list = None
+
+
 class MacroRecorder:
     def __init__(self):
         self.recording = False
@@ -133,21 +333,40 @@ class MacroRecorder:
 
     def stop_recording(self):
         if self.recording and self.current_macro:
-            self.macros[self.current_macro] = self.actions.copy()
+            self.macros[self.current_macro] = self._compile(self.actions)
         self.recording = False
         self.actions = []
 
     def record_action(self, action_type, params):
         if self.recording:
-            self.actions.append({
-                'type': action_type,
-                'params': params
-            })
+            # Flaches Tupel statt Dict - eine Aufzeichnung erzeugt sonst
+            # zwei GC-verwaltete Objekte pro Mausbewegung
+            self.actions.append((action_type, tuple(params)))
+
+    @staticmethod
+    def _compile(actions):
+        """Aktionsliste beim Stoppen in eine Abspiel-Funktion übersetzen
+
+        Die Aktionsnamen werden beim Kompilieren dedupliziert; der
+        getattr-Dispatch läuft dann einmal pro Name und Abspielen (die
+        Canvas-Instanz kommt erst beim Abspielen herein), nicht einmal
+        pro Aktion.
+        """
+        steps = list(actions)
+        names = {name for name, _ in steps}
+
+        def playback(canvas):
+            canvas.save_state()
+            bound = {name: getattr(canvas, name) for name in names}
+            for name, args in steps:
+                bound[name](*args)
+
+        return playback
 
     def play_macro(self, name, canvas):
-        if name in self.macros:
-            for action in self.macros[name]:
-                canvas.execute_action(action['type'], action['params'])
+        macro = self.macros.get(name)
+        if macro is not None:
+            macro(canvas)
 
 
 class PixelCanvas(QWidget):
@@ -159,10 +378,39 @@ class PixelCanvas(QWidget):
         self.grid_size = grid_size
         self.cell_size = 20
         self.virtual_size = grid_size * 3  # Virtual canvas size for move operations
+        self._virtual_offset = grid_size  # Center the visible area
 
-        # Initialize undo/redo stacks BEFORE creating layers
-        self.undo_stack = []
+        # Initialize undo/redo stacks BEFORE creating layers.
+        # deque(maxlen) verdrängt den ältesten Frame in O(1) statt pop(0)
+        self.undo_stack = deque(maxlen=MAX_UNDO_STEPS)
         self.redo_stack = []
+        # Vollaufgelöster Stand des obersten Undo-Zustands - die Frames auf
+        # den Stacks sind nur noch komprimierte Differenzen
+        self._undo_cursor = None
+        self._undo_cursor_meta = None
+        self._dirty_since_last_save = False
+
+        # Composite cache: fertig skaliertes Bild aller sichtbaren Ebenen,
+        # von dem pro Frame nur der schmutzige Bereich neu aufgebaut wird
+        self._composite_cache = None
+        self._composite_dirty = None
+        self._composite_skip_layer = None
+
+        # Vorberechnete Gitterlinien (ändern sich nur mit grid_size/cell_size)
+        self._grid_lines = None
+        self._grid_lines_key = None
+        self._rot_preview = None
+        self._rot_preview_key = None
+        self._grid_pen = QPen(QColor(180, 180, 180), 1)
+
+        # Repaints bündeln: update() startet nur den Single-Shot-Timer,
+        # gezeichnet wird höchstens einmal pro Frame - Trackpads liefern
+        # sonst 200+ Repaints pro Sekunde
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.setInterval(16)
+        self._repaint_timer.timeout.connect(super().update)
+        self._last_motion_pixel = None
 
         # Initialize layers with virtual size
         self.layers = []
@@ -171,13 +419,21 @@ class PixelCanvas(QWidget):
 
         self.primary_color = QColor(0, 0, 0)
         self.secondary_color = QColor(255, 255, 255)
+        # Gepackte Primärfarbe für die direkten Puffer-Schreibpfade
+        self._primary_key = None
+        self._primary_rgba = np.uint32(0)
         self.draw_mode = DrawMode.PENCIL
         self.pen_width = 1
         self.blur_mode = False
 
         self.drawing = False
         self.last_pos = None
-        self.preview_pixmap = None
+        self.preview_image = None
+        # Persistenter Vorschau-Puffer: wird nicht pro Mausklick neu
+        # angelegt, sondern nur der zuletzt bemalte Bereich gelöscht
+        self._preview_buffer = None
+        self._preview_view = None
+        self._preview_dirty = None
         self.polygon_points = []
 
         self.background_color = QColor(200, 200, 200)
@@ -187,6 +443,7 @@ class PixelCanvas(QWidget):
         self.move_start = None
         self.move_offset = QPoint(0, 0)
         self.temp_move_pixmap = None
+        self._move_src = None
 
         # Rotation preview
         self.rotation_preview_angle = 0
@@ -201,33 +458,32 @@ class PixelCanvas(QWidget):
 
     def add_initial_layer(self):
         """Add initial layer with virtual canvas"""
-        pixmap = QPixmap(self.virtual_size, self.virtual_size)
-        pixmap.fill(Qt.GlobalColor.transparent)
+        layer = Layer.create("Background", self.virtual_size)
 
         # Fill center area with white (visible grid area)
-        painter = QPainter(pixmap)
         offset = self.grid_size
-        painter.fillRect(offset, offset, self.grid_size, self.grid_size, Qt.GlobalColor.white)
-        painter.end()
+        layer.data[offset:offset + self.grid_size, offset:offset + self.grid_size] = 0xFFFFFFFF
+        layer.mark_dirty()
 
-        self.layers = [Layer("Background", pixmap)]
+        self.layers = [layer]
 
         # Initialize undo stack with initial state
         self.save_state()
 
     def get_virtual_offset(self):
         """Get offset for virtual canvas"""
-        return self.grid_size  # Center the visible area
+        return self._virtual_offset
 
     def update_size(self):
         size = self.grid_size * self.cell_size
         self.setFixedSize(size, size)
 
     def add_layer(self, name="New Layer"):
-        pixmap = QPixmap(self.virtual_size, self.virtual_size)
-        pixmap.fill(Qt.GlobalColor.transparent)
-        self.layers.append(Layer(name, pixmap))
+        self.layers.append(Layer.create(name, self.virtual_size))
         self.current_layer = len(self.layers) - 1
+        # Strukturänderung als eigener Undo-Schritt: ohne Dirty-Flag
+        # würde der nächste save_state sie in den folgenden Strich falten
+        self._dirty_since_last_save = True
         return self.current_layer
 
     def remove_layer(self, index):
@@ -235,32 +491,27 @@ class PixelCanvas(QWidget):
             del self.layers[index]
             if self.current_layer >= len(self.layers):
                 self.current_layer = len(self.layers) - 1
+            self.invalidate_composite()
 
     def toggle_layer_visibility(self, index):
         if 0 <= index < len(self.layers):
             self.layers[index].visible = not self.layers[index].visible
+            self.invalidate_composite()
             self.update()
 
-    def get_top_visible_layer(self):
-        """Get the topmost visible layer for drawing"""
-        for i in range(len(self.layers) - 1, -1, -1):
-            if self.layers[i].visible:
-                return i
-        return 0
-
     def clear_layer(self):
         """Clear current layer"""
         self.save_state()
         offset = self.get_virtual_offset()
 
+        # Direkter Puffer-Fill statt QPainter-Aufbau für zwei Rechtecke
+        layer = self.layers[self.current_layer]
+        layer.data.fill(0)
         if self.current_layer == 0:
             # For background, refill the center area with white
-            self.layers[0].pixmap.fill(Qt.GlobalColor.transparent)
-            painter = QPainter(self.layers[0].pixmap)
-            painter.fillRect(offset, offset, self.grid_size, self.grid_size, Qt.GlobalColor.white)
-            painter.end()
-        else:
-            self.layers[self.current_layer].pixmap.fill(Qt.GlobalColor.transparent)
+            layer.data[offset:offset + self.grid_size, offset:offset + self.grid_size] = 0xFFFFFFFF
+        layer.mark_dirty()
+        self.invalidate_composite()
         self.update()
 
     def reset_all(self):
@@ -273,166 +524,329 @@ class PixelCanvas(QWidget):
 
         if reply == QMessageBox.StandardButton.Yes:
             self.layers.clear()
-            self.add_initial_layer()
-            self.current_layer = 0
             self.undo_stack.clear()
             self.redo_stack.clear()
+            # Undo-Cursor mit verwerfen: er hielte sonst das alte Projekt,
+            # und bei sauberem Dirty-Flag würde der save_state in
+            # add_initial_layer gar keinen frischen Stand ziehen
+            self._undo_cursor = None
+            self._undo_cursor_meta = None
+            self._dirty_since_last_save = False
+            self.invalidate_composite()
+            self.add_initial_layer()
+            self.current_layer = 0
             self.update()
 
+    def _snapshot_meta(self):
+        return [{
+            'name': layer.name,
+            'visible': layer.visible,
+            'opacity': layer.opacity,
+            'epoch': layer.epoch
+        } for layer in self.layers]
+
+    @staticmethod
+    def _compress_full(arr):
+        return arr.shape, zlib.compress(arr.tobytes())
+
+    @staticmethod
+    def _decompress_full(shape, blob):
+        return np.frombuffer(zlib.decompress(blob), dtype=np.uint32).reshape(shape).copy()
+
     def save_state(self):
-        # Don't save if no changes have been made
-        if len(self.undo_stack) > 0:
-            last_state = self.undo_stack[-1]
-            current_matches = True
-            if len(last_state) == len(self.layers):
-                for i, layer in enumerate(self.layers):
-                    if (layer.name != last_state[i]['name'] or
-                            layer.visible != last_state[i]['visible'] or
-                            layer.opacity != last_state[i]['opacity'] or
-                            layer.pixmap.toImage() != last_state[i]['pixmap'].toImage()):
-                        current_matches = False
-                        break
-            else:
-                current_matches = False
+        # Fast out: no mutator has run since the last snapshot
+        if self._undo_cursor is not None and not self._dirty_since_last_save:
+            return
+
+        meta = self._snapshot_meta()
 
-            if current_matches:
+        if self._undo_cursor is not None:
+            # Equal epochs mean equal content - mark_dirty bumps the epoch
+            # on any buffer write, so no pixel comparison is needed
+            if meta == self._undo_cursor_meta:
+                self._dirty_since_last_save = False
                 return  # No changes, don't save
 
-        if len(self.undo_stack) >= MAX_UNDO_STEPS:
-            self.undo_stack.pop(0)
+            frame = self._make_frame(meta)
+            if frame is not None:
+                self.undo_stack.append(frame)
+                self.redo_stack.clear()
+
+        self._undo_cursor = [layer.data.copy() for layer in self.layers]
+        self._undo_cursor_meta = meta
+        self._dirty_since_last_save = False
+
+    def _make_frame(self, meta):
+        """Differenz zwischen Undo-Cursor und aktuellem Canvas verpacken
+
+        Gibt None zurück, wenn es nichts Sichtbares zu verpacken gibt -
+        etwa ein Strich in der schon vorhandenen Farbe, der nur Epochen
+        gebumpt, aber kein Pixel verändert hat.
+        """
+        prev_arrays = self._undo_cursor
+        prev_meta = self._undo_cursor_meta
+        cur_arrays = [layer.data for layer in self.layers]
+
+        if (len(prev_arrays) != len(cur_arrays) or
+                any(p.shape != c.shape for p, c in zip(prev_arrays, cur_arrays))):
+            # Structure changed - store both sides as full snapshots
+            return UndoFrame(
+                prev_meta, meta,
+                before_full=[self._compress_full(a) for a in prev_arrays],
+                after_full=[self._compress_full(a) for a in cur_arrays]
+            )
 
-        state = []
-        for layer in self.layers:
-            state.append({
-                'name': layer.name,
-                'pixmap': layer.pixmap.copy(),
-                'visible': layer.visible,
-                'opacity': layer.opacity
-            })
-        self.undo_stack.append(state)
-        self.redo_stack.clear()
+        deltas = []
+        for prev, cur, pm, cm in zip(prev_arrays, cur_arrays, prev_meta, meta):
+            if pm['epoch'] == cm['epoch']:
+                deltas.append(None)
+                continue
+
+            diff = prev != cur
+            rows = np.flatnonzero(diff.any(axis=1))
+            if rows.size == 0:
+                deltas.append(None)
+                continue
+            cols = np.flatnonzero(diff.any(axis=0))
+            y0, y1 = int(rows[0]), int(rows[-1]) + 1
+            x0, x1 = int(cols[0]), int(cols[-1]) + 1
+
+            xor = np.bitwise_xor(prev[y0:y1, x0:x1], cur[y0:y1, x0:x1])
+            deltas.append(((y0, x0, y1, x1), zlib.compress(xor.tobytes())))
+
+        if (all(delta is None for delta in deltas)
+                and all((pm['name'], pm['visible'], pm['opacity'])
+                        == (cm['name'], cm['visible'], cm['opacity'])
+                        for pm, cm in zip(prev_meta, meta))):
+            return None  # toter Schritt: weder Pixel noch Nutzer-Metadaten
+
+        return UndoFrame(prev_meta, meta, deltas=deltas)
 
     def undo(self):
-        if len(self.undo_stack) > 1:  # Keep at least one state
-            self.redo_stack.append(self.undo_stack.pop())
-            state = self.undo_stack[-1]
-            self.restore_state(state)
+        if self.undo_stack:
+            frame = self.undo_stack.pop()
+            self._apply_frame(frame, backward=True)
+            self.redo_stack.append(frame)
+            self._restore_from_cursor()
 
     def redo(self):
         if self.redo_stack:
-            state = self.redo_stack.pop()
-            self.undo_stack.append(state)
-            self.restore_state(state)
+            frame = self.redo_stack.pop()
+            self._apply_frame(frame, backward=False)
+            self.undo_stack.append(frame)
+            self._restore_from_cursor()
+
+    def _apply_frame(self, frame, backward):
+        """Den Undo-Cursor entlang eines Frames vor- oder zurückbewegen"""
+        if frame.deltas is None:
+            full = frame.before_full if backward else frame.after_full
+            self._undo_cursor = [self._decompress_full(shape, blob) for shape, blob in full]
+        else:
+            for i, delta in enumerate(frame.deltas):
+                if delta is None:
+                    continue
+                (y0, x0, y1, x1), blob = delta
+                xor = np.frombuffer(zlib.decompress(blob), dtype=np.uint32).reshape(
+                    y1 - y0, x1 - x0
+                )
+                self._undo_cursor[i][y0:y1, x0:x1] ^= xor
+        self._undo_cursor_meta = frame.before_meta if backward else frame.after_meta
 
-    def restore_state(self, state):
+    def _restore_from_cursor(self):
         self.layers.clear()
-        for layer_data in state:
+        for arr, layer_meta in zip(self._undo_cursor, self._undo_cursor_meta):
             layer = Layer(
-                layer_data['name'],
-                layer_data['pixmap'].copy(),
-                layer_data['visible'],
-                layer_data['opacity']
+                layer_meta['name'],
+                arr.copy(),
+                layer_meta['visible'],
+                layer_meta['opacity']
             )
+            # Keep the snapshot's epoch so a follow-up save_state recognizes
+            # the restored content as unchanged
+            layer.epoch = layer_meta['epoch']
             self.layers.append(layer)
+
+        # Canvas-Maße aus der Pufferform ableiten (virtual = 3 * grid):
+        # ein Undo über resize_grid hinweg stellt sonst alte Puffer unter
+        # den neuen Maßen wieder her und Direktzugriffe laufen ins Leere
+        virtual = self._undo_cursor[0].shape[0]
+        if virtual != self.virtual_size:
+            self.virtual_size = virtual
+            self.grid_size = virtual // 3
+            self._virtual_offset = self.grid_size
+            self.update_size()
+
+        self.invalidate_composite()
         self.update()
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.fillRect(self.rect(), self.background_color)
+    def invalidate_composite(self, rect=None):
+        """Bereich (in Gitterkoordinaten) für die Composite-Neuberechnung vormerken"""
+        # Jede Mutation läuft hier durch - billiger O(1)-Marker für save_state
+        self._dirty_since_last_save = True
+        if rect is None:
+            rect = QRect(0, 0, self.grid_size, self.grid_size)
+        if self._composite_dirty is None:
+            self._composite_dirty = QRect(rect)
+        else:
+            self._composite_dirty = self._composite_dirty.united(rect)
 
-        offset = self.get_virtual_offset()
+    def _refresh_composite(self, skip_layer=None):
+        """Composite-Cache aufbauen bzw. nur die schmutzigen Zellen nachziehen"""
+        offset = self._virtual_offset
+
+        if (self._composite_cache is None or
+                self._composite_cache.size() != self.size() or
+                skip_layer != self._composite_skip_layer):
+            self._composite_cache = QPixmap(self.size())
+            self._composite_skip_layer = skip_layer
+            self._composite_dirty = QRect(0, 0, self.grid_size, self.grid_size)
+
+        if self._composite_dirty is None:
+            return
 
-        # Draw layers (only visible area) - but hide current layer if rotating
+        dirty = self._composite_dirty.intersected(QRect(0, 0, self.grid_size, self.grid_size))
+        self._composite_dirty = None
+        if dirty.isEmpty():
+            return
+
+        target = QRect(
+            dirty.x() * self.cell_size, dirty.y() * self.cell_size,
+            dirty.width() * self.cell_size, dirty.height() * self.cell_size
+        )
+        source = QRect(offset + dirty.x(), offset + dirty.y(), dirty.width(), dirty.height())
+
+        painter = QPainter(self._composite_cache)
+        painter.fillRect(target, self.background_color)
         for i, layer in enumerate(self.layers):
-            if layer.visible:
-                # Skip current layer if we're showing rotation preview
-                if i == self.current_layer and self.rotation_preview_active and self.rotation_preview_angle != 0:
+            if layer.visible and i != skip_layer:
+                # Leere Ebenen (frisch angelegt, weggewischt) komplett
+                # überspringen - der Blit wäre ein reines Alpha-Nichts
+                bbox = layer.content_bbox()
+                if bbox is None or not bbox.intersects(source):
                     continue
+                # Opacity is baked into the pixmap - plain over-blit
+                painter.drawPixmap(target, layer.pixmap, source)
+        painter.end()
 
-                # Extract visible area from virtual canvas
-                visible_area = layer.pixmap.copy(offset, offset, self.grid_size, self.grid_size)
-                scaled = visible_area.scaled(
-                    self.width(), self.height(),
-                    Qt.AspectRatioMode.IgnoreAspectRatio,
-                    Qt.TransformationMode.FastTransformation
-                )
-                painter.setOpacity(layer.opacity)
-                painter.drawPixmap(0, 0, scaled)
+    def update(self):
+        """Koaleszierter Repaint: höchstens ein paintEvent pro Frame"""
+        if not self._repaint_timer.isActive():
+            self._repaint_timer.start()
 
-        # Draw rotation preview
-        if self.rotation_preview_active and self.rotation_preview_angle != 0:
-            painter.setOpacity(self.layers[self.current_layer].opacity * 0.8)  # Slightly transparent
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        # Keep nearest-neighbour scaling for the source-rect blits below
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
 
-            # Get current layer content
-            current_layer = self.layers[self.current_layer]
-            visible_area = current_layer.pixmap.copy(offset, offset, self.grid_size, self.grid_size)
+        offset = self._virtual_offset
 
-            # Apply rotation
-            transform = QTransform()
-            transform.translate(visible_area.width() / 2, visible_area.height() / 2)
-            transform.rotate(self.rotation_preview_angle)
-            transform.translate(-visible_area.width() / 2, -visible_area.height() / 2)
+        # During rotation preview the current layer is drawn rotated on top,
+        # so it is excluded from the cached composite
+        rotating = self.rotation_preview_active and self.rotation_preview_angle != 0
 
-            # Use same transformation mode as final rotation
-            if self.smooth_rotation:
-                transformation_mode = Qt.TransformationMode.SmoothTransformation
-            else:
-                transformation_mode = Qt.TransformationMode.FastTransformation
+        self._refresh_composite(skip_layer=self.current_layer if rotating else None)
+        painter.drawPixmap(0, 0, self._composite_cache)
 
-            rotated = visible_area.transformed(transform, transformation_mode)
+        # Draw rotation preview
+        if rotating:
+            painter.setOpacity(self.layers[self.current_layer].opacity * 0.8)  # Slightly transparent
 
-            # Scale and center the rotated preview
-            scaled_rotated = rotated.scaled(
-                self.width(), self.height(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.FastTransformation
-            )
+            rotated = self._rotated_preview(offset)
 
-            x = (self.width() - scaled_rotated.width()) // 2
-            y = (self.height() - scaled_rotated.height()) // 2
-            painter.drawPixmap(x, y, scaled_rotated)
+            # Scale and center in one pass of the blit - no intermediate
+            # scaled() allocation
+            scale = min(self.width() / rotated.width(),
+                        self.height() / rotated.height())
+            target_w = int(rotated.width() * scale)
+            target_h = int(rotated.height() * scale)
+            target = QRect((self.width() - target_w) // 2,
+                           (self.height() - target_h) // 2,
+                           target_w, target_h)
+            painter.drawImage(target, rotated)
 
             painter.setOpacity(1.0)
 
-        # Draw preview
-        if self.preview_pixmap:
+        # Draw preview - source rect blit, no intermediate copy/scaled pixmaps
+        if self.preview_image is not None:
             painter.setOpacity(0.5)
-            visible_preview = self.preview_pixmap.copy(offset, offset, self.grid_size, self.grid_size)
-            scaled = visible_preview.scaled(
-                self.width(), self.height(),
-                Qt.AspectRatioMode.IgnoreAspectRatio,
-                Qt.TransformationMode.FastTransformation
+            painter.drawImage(
+                QRect(0, 0, self.width(), self.height()),
+                self.preview_image,
+                QRect(offset, offset, self.grid_size, self.grid_size)
             )
-            painter.drawPixmap(0, 0, scaled)
 
         # Move preview
         if self.temp_move_pixmap and self.draw_mode == DrawMode.MOVE:
             painter.setOpacity(0.5)
-            move_x = self.move_offset.x() * self.cell_size
-            move_y = self.move_offset.y() * self.cell_size
-
-            # Extract visible area with offset
-            visible_move = self.temp_move_pixmap.copy(
-                offset - self.move_offset.x(),
-                offset - self.move_offset.y(),
-                self.grid_size, self.grid_size
-            )
-            scaled = visible_move.scaled(
-                self.width(), self.height(),
-                Qt.AspectRatioMode.IgnoreAspectRatio,
-                Qt.TransformationMode.FastTransformation
+            painter.drawPixmap(
+                QRect(0, 0, self.width(), self.height()),
+                self.temp_move_pixmap,
+                QRect(
+                    offset - self.move_offset.x(),
+                    offset - self.move_offset.y(),
+                    self.grid_size, self.grid_size
+                )
             )
-            painter.drawPixmap(0, 0, scaled)
 
-        # Draw grid on top of everything
-        if self.show_grid:
+        # Draw grid on top of everything - one drawLines call instead of
+        # 2*(grid_size+1) einzelne drawLine-Aufrufe. Unter 4 px Zellgröße
+        # würde das Gitter fast jede Zelle überdecken - weglassen
+        if self.show_grid and self.cell_size >= 4:
             painter.setOpacity(1.0)
-            painter.setPen(QPen(QColor(180, 180, 180), 1))
-            for i in range(self.grid_size + 1):
-                x = i * self.cell_size
-                y = i * self.cell_size
-                painter.drawLine(x, 0, x, self.height())
-                painter.drawLine(0, y, self.width(), y)
+            painter.setPen(self._grid_pen)
+            painter.drawLines(self._get_grid_lines())
+
+    def _rotated_preview(self, offset):
+        """Gedrehtes Abbild der aktuellen Ebene für die Rotationsvorschau
+
+        Wird pro (Ebene, Epoche, Winkel, Modus) gecacht - während des
+        Slider-Ziehens transformiert so nur der erste Repaint pro
+        Winkel, alle weiteren zeichnen das fertige Bild erneut.
+        """
+        layer = self.layers[self.current_layer]
+        key = (self.current_layer, layer.epoch, self.rotation_preview_angle,
+               self.smooth_rotation, self.grid_size)
+        if self._rot_preview_key != key:
+            visible_area = layer.qimage.copy(offset, offset,
+                                             self.grid_size, self.grid_size)
+
+            transform = QTransform()
+            transform.translate(visible_area.width() / 2, visible_area.height() / 2)
+            transform.rotate(self.rotation_preview_angle)
+            transform.translate(-visible_area.width() / 2, -visible_area.height() / 2)
+
+            # Use same transformation mode as final rotation
+            if self.smooth_rotation:
+                transformation_mode = Qt.TransformationMode.SmoothTransformation
+            else:
+                transformation_mode = Qt.TransformationMode.FastTransformation
+
+            self._rot_preview = visible_area.transformed(transform, transformation_mode)
+            self._rot_preview_key = key
+        return self._rot_preview
+
+    def _get_grid_lines(self):
+        """Gitterlinien als sip.array(QLineF), nur bei Größenänderung neu befüllt"""
+        key = (self.grid_size, self.cell_size)
+        if self._grid_lines_key != key:
+            n = self.grid_size + 1
+            lines = sip.array(QLineF, 2 * n)
+            # Zero-copy: das sip.array liegt als flacher float64-Puffer
+            # (x1, y1, x2, y2 je Linie) im Speicher
+            coords = np.frombuffer(lines, dtype=np.float64).reshape(2 * n, 4)
+            ticks = np.arange(n, dtype=np.float64) * self.cell_size
+            extent = float(self.grid_size * self.cell_size)
+            coords[:n, 0] = ticks
+            coords[:n, 1] = 0.0
+            coords[:n, 2] = ticks
+            coords[:n, 3] = extent
+            coords[n:, 0] = 0.0
+            coords[n:, 1] = ticks
+            coords[n:, 2] = extent
+            coords[n:, 3] = ticks
+            self._grid_lines = lines
+            self._grid_lines_key = key
+        return self._grid_lines
 
     def get_pixel_pos(self, pos):
         x = pos.x() // self.cell_size
@@ -441,7 +855,7 @@ class PixelCanvas(QWidget):
 
     def get_virtual_pos(self, pixel_pos):
         """Convert pixel position to virtual canvas position"""
-        offset = self.get_virtual_offset()
+        offset = self._virtual_offset
         return QPoint(pixel_pos.x() + offset, pixel_pos.y() + offset)
 
     def mousePressEvent(self, event):
@@ -460,6 +874,7 @@ class PixelCanvas(QWidget):
 
             self.drawing = True
             self.last_pos = pixel_pos
+            self._last_motion_pixel = pixel_pos
 
             if self.draw_mode == DrawMode.PENCIL:
                 self.draw_pixel(pixel_pos)
@@ -477,8 +892,7 @@ class PixelCanvas(QWidget):
             elif self.draw_mode in [DrawMode.LINE, DrawMode.RECTANGLE, DrawMode.FILLED_RECTANGLE,
                                     DrawMode.CIRCLE, DrawMode.FILLED_CIRCLE, DrawMode.TRIANGLE,
                                     DrawMode.FILLED_TRIANGLE]:
-                self.preview_pixmap = QPixmap(self.virtual_size, self.virtual_size)
-                self.preview_pixmap.fill(Qt.GlobalColor.transparent)
+                self.preview_image = self._acquire_preview()
 
     def mouseMoveEvent(self, event):
         pixel_pos = self.get_pixel_pos(event.pos())
@@ -488,6 +902,12 @@ class PixelCanvas(QWidget):
             self.positionChanged.emit(pixel_pos.x(), pixel_pos.y())
 
         if self.drawing:
+            # Hoch auflösende Eingabegeräte melden mehrere Events pro
+            # Zelle - gleiche Zelle heißt gleiches Ergebnis, früh raus
+            if pixel_pos == self._last_motion_pixel:
+                return
+            self._last_motion_pixel = pixel_pos
+
             if self.draw_mode == DrawMode.PENCIL:
                 self.draw_line(self.last_pos, pixel_pos)
                 self.last_pos = pixel_pos
@@ -508,15 +928,20 @@ class PixelCanvas(QWidget):
 
             if self.draw_mode == DrawMode.MOVE:
                 self.apply_move()
-            elif self.preview_pixmap and self.draw_mode != DrawMode.POLYGON:
+            elif self.preview_image is not None and self.draw_mode != DrawMode.POLYGON:
                 self.apply_preview()
-                self.preview_pixmap = None
+                self.preview_image = None
 
     def start_move(self, pos):
         """Start move operation"""
         self.move_start = pos
         self.move_offset = QPoint(0, 0)
-        self.temp_move_pixmap = self.layers[self.current_layer].pixmap.copy()
+        # The cached pixmap is never mutated in place, only replaced -
+        # holding the reference is snapshot enough, no copy needed
+        self.temp_move_pixmap = self.layers[self.current_layer].pixmap
+        # Snapshot of the layer buffer - apply_move shifts this by the final
+        # offset with one slice assignment instead of repainting the pixmap
+        self._move_src = self.layers[self.current_layer].data.copy()
         # Don't clear the layer, just prepare for move
 
     def update_move(self, pos):
@@ -533,102 +958,189 @@ class PixelCanvas(QWidget):
     def apply_move(self):
         """Apply move operation"""
         if self.temp_move_pixmap:
-            # Clear current layer and redraw at new position
-            self.layers[self.current_layer].pixmap.fill(Qt.GlobalColor.transparent)
-            painter = QPainter(self.layers[self.current_layer].pixmap)
-            painter.drawPixmap(self.move_offset, self.temp_move_pixmap)
-            painter.end()
+            # Shift the snapshot into the live buffer with one slice write
+            layer = self.layers[self.current_layer]
+            src = self._move_src
+            height, width = src.shape
+            dx, dy = self.move_offset.x(), self.move_offset.y()
+
+            buf = layer.data
+            buf[:] = 0
+            if abs(dx) < width and abs(dy) < height:
+                # Komplett aus dem Puffer geschoben? Dann bleibt er leer -
+                # sonst kollabiert das Ziel-Slice, während das Quell-Slice
+                # über den negativen Stop noch Spalten liefert
+                buf[max(dy, 0):height + min(dy, 0), max(dx, 0):width + min(dx, 0)] = \
+                    src[max(-dy, 0):height - max(dy, 0), max(-dx, 0):width - max(dx, 0)]
+            layer.mark_dirty()
+            self.invalidate_composite()
 
             self.temp_move_pixmap = None
+            self._move_src = None
             self.move_start = None
             self.move_offset = QPoint(0, 0)
             self.update()
 
+    def set_primary_color(self, color):
+        """Primärfarbe setzen und die abgeleiteten Mal-Objekte vorbereiten"""
+        self.primary_color = color
+        self._ensure_primary_cache()
+
+    def set_secondary_color(self, color):
+        self.secondary_color = color
+
+    def _ensure_primary_cache(self):
+        """Gepackte Farbe, QPen und QBrush nur nach Farb-/Breitenwechsel neu bauen"""
+        key = (self.primary_color.rgba(), self.pen_width)
+        if key != self._primary_key:
+            color = self.primary_color
+            self._primary_key = key
+            self._primary_rgba = pack_premultiplied(color)
+            self._primary_pen1 = QPen(color, 1)
+            self._primary_pen = QPen(color, self.pen_width)
+            blur_color = QColor(color)
+            blur_color.setAlpha(128)
+            self._primary_pen_blur = QPen(blur_color, self.pen_width * 1.5)
+            self._primary_brush = QBrush(color)
+
+    def _packed_primary(self):
+        """Premultiplizierte Primärfarbe, nur nach Farbwechsel neu gepackt"""
+        self._ensure_primary_cache()
+        return self._primary_rgba
+
     def draw_pixel(self, pos):
         virtual_pos = self.get_virtual_pos(pos)
 
-        painter = QPainter(self.layers[self.current_layer].pixmap)
+        layer = self.layers[self.current_layer]
+
+        # Opaque single pixel: one store into the layer buffer, no QPainter
+        # setup. Translucent colors still need source-over blending below.
+        if not self.blur_mode and self.primary_color.alpha() == 255:
+            x, y = virtual_pos.x(), virtual_pos.y()
+            height, width = layer.data.shape
+            if 0 <= x < width and 0 <= y < height:
+                layer.data[y, x] = self._packed_primary()
+                layer.mark_dirty()
+                self.invalidate_composite(QRect(pos.x() - 1, pos.y() - 1, 3, 3))
+                self.update()
+            return
 
+        self._ensure_primary_cache()
+        painter = QPainter(layer.qimage)
         if self.blur_mode:
             painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            color = QColor(self.primary_color)
-            color.setAlpha(128)  # Semi-transparent for blur effect
-            painter.setPen(QPen(color, self.pen_width * 1.5))
+            painter.setPen(self._primary_pen_blur)
         else:
-            painter.setPen(QPen(self.primary_color, 1))
-
+            painter.setPen(self._primary_pen1)
         painter.drawPoint(virtual_pos)
         painter.end()
+        layer.mark_dirty()
+        pad = max(1, self.pen_width)
+        self.invalidate_composite(QRect(pos.x() - pad, pos.y() - pad, 2 * pad + 1, 2 * pad + 1))
         self.update()
 
     def draw_line(self, start, end):
         virtual_start = self.get_virtual_pos(start)
         virtual_end = self.get_virtual_pos(end)
 
-        painter = QPainter(self.layers[self.current_layer].pixmap)
+        layer = self.layers[self.current_layer]
+
+        # 1-Pixel-Linien rastern immer über Bresenham (gleiche Pixelwahl
+        # wie früher): deckende Farbe schreibt direkt, halbtransparente
+        # blendet premultipliziert über den Untergrund. Breite deckende
+        # Stifte stempeln eine Kreisscheibe pro Linienpunkt.
+        if not self.blur_mode and (self.pen_width == 1
+                                   or self.primary_color.alpha() == 255):
+            if self.pen_width == 1:
+                kernel = (pixel_ops.bresenham
+                          if self.primary_color.alpha() == 255
+                          else pixel_ops.bresenham_blend)
+                kernel(
+                    layer.data,
+                    virtual_start.x(), virtual_start.y(),
+                    virtual_end.x(), virtual_end.y(),
+                    self._packed_primary()
+                )
+            else:
+                pixel_ops.bresenham_thick(
+                    layer.data,
+                    virtual_start.x(), virtual_start.y(),
+                    virtual_end.x(), virtual_end.y(),
+                    self._packed_primary(), self.pen_width // 2
+                )
+            layer.mark_dirty()
+            pad = max(1, self.pen_width)
+            self.invalidate_composite(
+                QRect(start, end).normalized().adjusted(-pad, -pad, pad, pad))
+            self.update()
+            return
+
+        self._ensure_primary_cache()
+        painter = QPainter(layer.qimage)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)  # Pixel-perfect
 
         if self.blur_mode:
             painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            color = QColor(self.primary_color)
-            color.setAlpha(128)
-            painter.setPen(QPen(color, self.pen_width * 1.5))
+            painter.setPen(self._primary_pen_blur)
         else:
-            painter.setPen(QPen(self.primary_color, self.pen_width))
+            painter.setPen(self._primary_pen)
 
-        # Use Bresenham's line algorithm for pixel-perfect lines
-        if self.pen_width == 1 and not self.blur_mode:
-            self.draw_bresenham_line(painter, virtual_start, virtual_end)
-        else:
-            painter.drawLine(virtual_start, virtual_end)
+        painter.drawLine(virtual_start, virtual_end)
 
         painter.end()
+        layer.mark_dirty()
+        pad = max(1, self.pen_width)
+        self.invalidate_composite(QRect(start, end).normalized().adjusted(-pad, -pad, pad, pad))
         self.update()
 
-    def draw_bresenham_line(self, painter, start, end):
-        """Bresenham's line algorithm for pixel-perfect lines"""
-        x0, y0 = start.x(), start.y()
-        x1, y1 = end.x(), end.y()
-
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        sx = 1 if x0 < x1 else -1
-        sy = 1 if y0 < y1 else -1
-        err = dx - dy
-
-        while True:
-            painter.drawPoint(x0, y0)
-
-            if x0 == x1 and y0 == y1:
-                break
-
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x0 += sx
-            if e2 < dx:
-                err += dx
-                y0 += sy
+    def _acquire_preview(self):
+        """Persistenten Vorschau-Puffer liefern, nur bei Größenwechsel neu anlegen"""
+        if (self._preview_buffer is None or
+                self._preview_buffer.width() != self.virtual_size):
+            image = QImage(self.virtual_size, self.virtual_size,
+                           QImage.Format.Format_ARGB32_Premultiplied)
+            image.fill(Qt.GlobalColor.transparent)
+            bits = image.bits()
+            bits.setsize(image.sizeInBytes())
+            self._preview_view = np.frombuffer(bits, dtype=np.uint32).reshape(
+                self.virtual_size, self.virtual_size
+            )
+            self._preview_buffer = image
+            self._preview_dirty = None
+        self._clear_preview_dirty()
+        return self._preview_buffer
+
+    def _clear_preview_dirty(self):
+        """Nur den zuletzt bemalten Bereich des Vorschau-Puffers löschen"""
+        if self._preview_dirty is not None:
+            d = self._preview_dirty.intersected(
+                QRect(0, 0, self.virtual_size, self.virtual_size)
+            )
+            self._preview_view[d.y():d.y() + d.height(), d.x():d.x() + d.width()] = 0
+            self._preview_dirty = None
 
     def update_preview(self, current_pos):
-        if not self.preview_pixmap:
+        if self.preview_image is None:
             return
 
-        self.preview_pixmap.fill(Qt.GlobalColor.transparent)
-        painter = QPainter(self.preview_pixmap)
+        self._clear_preview_dirty()
+        pixel_perfect_ellipse = None
+        self._ensure_primary_cache()
+        painter = QPainter(self.preview_image)
 
         virtual_last = self.get_virtual_pos(self.last_pos)
         virtual_current = self.get_virtual_pos(current_pos)
 
         if self.blur_mode:
             painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            color = QColor(self.primary_color)
-            color.setAlpha(128)
-            painter.setPen(QPen(color, self.pen_width * 1.5))
+            painter.setPen(self._primary_pen_blur)
         else:
-            painter.setPen(QPen(self.primary_color, self.pen_width))
+            painter.setPen(self._primary_pen)
 
-        painter.setBrush(QBrush(self.primary_color))
+        painter.setBrush(self._primary_brush)
+
+        # Bounding box of the drawn shape - what needs clearing next time
+        shape_rect = QRect(virtual_last, virtual_current).normalized()
 
         if self.draw_mode == DrawMode.LINE:
             painter.drawLine(virtual_last, virtual_current)
@@ -654,17 +1166,19 @@ class PixelCanvas(QWidget):
             else:
                 # Ellipse
                 rect = QRect(virtual_last, virtual_current).normalized()
+            shape_rect = rect
 
             if self.draw_mode == DrawMode.CIRCLE:
                 painter.setBrush(Qt.BrushStyle.NoBrush)
                 if self.pen_width == 1 and not self.blur_mode:
-                    # Better circle algorithm for pixel art
-                    self.draw_pixel_perfect_ellipse(painter, rect)
+                    # Better circle algorithm for pixel art - rasterized by
+                    # the kernel once the painter has released the pixmap
+                    pixel_perfect_ellipse = rect
                 else:
                     painter.drawEllipse(rect)
             else:
                 # Filled ellipse/circle
-                painter.setBrush(QBrush(self.primary_color))
+                painter.setBrush(self._primary_brush)
                 painter.drawEllipse(rect)
         elif self.draw_mode in [DrawMode.TRIANGLE, DrawMode.FILLED_TRIANGLE]:
             # Better triangle with options
@@ -687,91 +1201,55 @@ class PixelCanvas(QWidget):
                     QPoint(virtual_last.x(), virtual_current.y())
                 ]
             polygon = QPolygon(points)
+            shape_rect = polygon.boundingRect()
             if self.draw_mode == DrawMode.TRIANGLE:
                 painter.setBrush(Qt.BrushStyle.NoBrush)
             painter.drawPolygon(polygon)
 
         painter.end()
+
+        if pixel_perfect_ellipse is not None:
+            rect = pixel_perfect_ellipse
+            # Rasterized by the kernel straight into the preview buffer
+            pixel_ops.midpoint_ellipse(
+                self._preview_view,
+                rect.center().x(), rect.center().y(),
+                rect.width() // 2, rect.height() // 2,
+                self._packed_primary()
+            )
+
+        pad = int(self.pen_width * 1.5) + 2
+        self._preview_dirty = shape_rect.adjusted(-pad, -pad, pad, pad)
+
         self.update()
 
     def apply_preview(self):
-        if self.preview_pixmap:
-            painter = QPainter(self.layers[self.current_layer].pixmap)
-            painter.drawPixmap(0, 0, self.preview_pixmap)
+        if self.preview_image is not None:
+            layer = self.layers[self.current_layer]
+            painter = QPainter(layer.qimage)
+            painter.drawImage(0, 0, self.preview_image)
             painter.end()
+            layer.mark_dirty()
+            self.invalidate_composite()
             self.update()
 
-    def draw_pixel_perfect_ellipse(self, painter, rect):
-        """Draw pixel-perfect ellipse using midpoint algorithm"""
-        cx = rect.center().x()
-        cy = rect.center().y()
-        rx = rect.width() // 2
-        ry = rect.height() // 2
-
-        # Midpoint ellipse algorithm
-        x = 0
-        y = ry
-        rx2 = rx * rx
-        ry2 = ry * ry
-        tworx2 = 2 * rx2
-        twory2 = 2 * ry2
-        p = 0
-        px = 0
-        py = tworx2 * y
-
-        # Plot initial points
-        self.plot_ellipse_points(painter, cx, cy, x, y)
-
-        # Region 1
-        p = round(ry2 - (rx2 * ry) + (0.25 * rx2))
-        while px < py:
-            x += 1
-            px += twory2
-            if p < 0:
-                p += ry2 + px
-            else:
-                y -= 1
-                py -= tworx2
-                p += ry2 + px - py
-            self.plot_ellipse_points(painter, cx, cy, x, y)
-
-        # Region 2
-        p = round(ry2 * (x + 0.5) * (x + 0.5) + rx2 * (y - 1) * (y - 1) - rx2 * ry2)
-        while y > 0:
-            y -= 1
-            py -= tworx2
-            if p > 0:
-                p += rx2 - py
-            else:
-                x += 1
-                px += twory2
-                p += rx2 - py + px
-            self.plot_ellipse_points(painter, cx, cy, x, y)
-
-    def plot_ellipse_points(self, painter, cx, cy, x, y):
-        """Plot symmetrical points for ellipse"""
-        painter.drawPoint(cx + x, cy + y)
-        painter.drawPoint(cx - x, cy + y)
-        painter.drawPoint(cx + x, cy - y)
-        painter.drawPoint(cx - x, cy - y)
-
     def draw_polygon(self):
         if len(self.polygon_points) < 3:
             return
 
-        painter = QPainter(self.layers[self.current_layer].pixmap)
+        layer = self.layers[self.current_layer]
+        self._ensure_primary_cache()
+        painter = QPainter(layer.qimage)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)  # Pixel-perfect
 
         if self.blur_mode:
             painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            color = QColor(self.primary_color)
-            color.setAlpha(128)
-            painter.setPen(QPen(color, self.pen_width * 1.5))
+            painter.setPen(self._primary_pen_blur)
         else:
-            painter.setPen(QPen(self.primary_color, self.pen_width))
+            painter.setPen(self._primary_pen)
 
         if self.draw_mode == DrawMode.FILLED_POLYGON:
-            painter.setBrush(QBrush(self.primary_color))
+            painter.setBrush(self._primary_brush)
         else:
             painter.setBrush(Qt.BrushStyle.NoBrush)
 
@@ -779,88 +1257,118 @@ class PixelCanvas(QWidget):
 
         # Option for regular polygons with Alt key
         if QApplication.keyboardModifiers() & Qt.KeyboardModifier.AltModifier and len(self.polygon_points) >= 3:
-            # Convert to regular polygon
+            # Convert to regular polygon - vertices computed in one
+            # vectorized pass instead of per-corner math.cos/math.sin
             center = polygon.boundingRect().center()
             radius = int(((self.polygon_points[0].x() - center.x()) ** 2 +
                           (self.polygon_points[0].y() - center.y()) ** 2) ** 0.5)
             sides = len(self.polygon_points)
 
-            regular_points = []
-            for i in range(sides):
-                angle = 2 * math.pi * i / sides - math.pi / 2
-                x = int(center.x() + radius * math.cos(angle))
-                y = int(center.y() + radius * math.sin(angle))
-                regular_points.append(QPoint(x, y))
-            polygon = QPolygon(regular_points)
+            angles = 2 * np.pi * np.arange(sides) / sides - np.pi / 2
+            xs = (center.x() + radius * np.cos(angles)).astype(np.int32)
+            ys = (center.y() + radius * np.sin(angles)).astype(np.int32)
+            polygon = QPolygon([QPoint(int(x), int(y)) for x, y in zip(xs, ys)])
 
         painter.drawPolygon(polygon)
         painter.end()
+        layer.mark_dirty()
+        self.invalidate_composite()
         self.update()
 
     def fill_area(self, pos):
         virtual_pos = self.get_virtual_pos(pos)
 
-        image = self.layers[self.current_layer].pixmap.toImage()
-        target_color = image.pixelColor(virtual_pos.x(), virtual_pos.y())
+        # Fill runs directly on the layer's uint32 buffer instead of going
+        # through pixelColor/setPixelColor for every single pixel
+        layer = self.layers[self.current_layer]
+        arr = layer.data
 
-        if target_color == self.primary_color:
+        x, y = virtual_pos.x(), virtual_pos.y()
+        height, width = arr.shape
+        if not (0 <= x < width and 0 <= y < height):
             return
+        target = arr[y, x]
+        replacement = self._packed_primary()
 
-        # Flood fill algorithm
-        stack = [(virtual_pos.x(), virtual_pos.y())]
-        while stack:
-            x, y = stack.pop()
-            if not (0 <= x < self.virtual_size and 0 <= y < self.virtual_size):
-                continue
+        if target == replacement:
+            return
 
-            if image.pixelColor(x, y) == target_color:
-                image.setPixelColor(x, y, self.primary_color)
-                stack.extend([(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)])
+        pixel_ops.flood_fill(arr, x, y, target, replacement)
 
-        self.layers[self.current_layer].pixmap = QPixmap.fromImage(image)
+        layer.mark_dirty()
+        self.invalidate_composite()
         self.update()
 
     def pick_color(self, pos):
         virtual_pos = self.get_virtual_pos(pos)
+        x, y = virtual_pos.x(), virtual_pos.y()
 
-        # Get color from the topmost visible layer
+        # Get color from the topmost visible layer - a single buffer read
+        # per layer instead of converting the whole pixmap to a QImage
         for i in range(len(self.layers) - 1, -1, -1):
             if self.layers[i].visible:
-                image = self.layers[i].pixmap.toImage()
-                color = image.pixelColor(virtual_pos.x(), virtual_pos.y())
-                if color.alpha() > 0:  # Non-transparent pixel
-                    self.colorPicked.emit(color)
+                value = int(self.layers[i].data[y, x])
+                alpha = (value >> 24) & 0xFF
+                if alpha > 0:  # Non-transparent pixel
+                    # Premultiplikation rückgängig machen
+                    red = ((value >> 16) & 0xFF) * 255 // alpha
+                    green = ((value >> 8) & 0xFF) * 255 // alpha
+                    blue = (value & 0xFF) * 255 // alpha
+                    self.colorPicked.emit(QColor(red, green, blue, alpha))
                     break
 
+    def execute_action(self, action_type, params):
+        """Einzelne aufgezeichnete Makro-Aktion ausführen (Name = Canvas-Methode)"""
+        handler = getattr(self, action_type, None)
+        if handler is not None:
+            handler(*params)
+
     def erase_pixel(self, pos):
         virtual_pos = self.get_virtual_pos(pos)
 
-        painter = QPainter(self.layers[self.current_layer].pixmap)
-        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
-        painter.setPen(QPen(Qt.GlobalColor.transparent, self.pen_width))
-        painter.drawPoint(virtual_pos)
-        painter.end()
+        layer = self.layers[self.current_layer]
+
+        if self.pen_width == 1:
+            # Single pixel: direct store, no QPainter round trip
+            x, y = virtual_pos.x(), virtual_pos.y()
+            height, width = layer.data.shape
+            if 0 <= x < width and 0 <= y < height:
+                layer.data[y, x] = 0
+                layer.mark_dirty()
+                self.invalidate_composite(QRect(pos.x() - 1, pos.y() - 1, 3, 3))
+                self.update()
+            return
+
+        # Breiter Radierer: gleiche Kreisscheibe wie der breite Stift,
+        # nur mit 0 (voll transparent) als Stempelfarbe
+        x, y = virtual_pos.x(), virtual_pos.y()
+        pixel_ops.bresenham_thick(layer.data, x, y, x, y, 0, self.pen_width // 2)
+        layer.mark_dirty()
+        pad = max(1, self.pen_width)
+        self.invalidate_composite(QRect(pos.x() - pad, pos.y() - pad, 2 * pad + 1, 2 * pad + 1))
         self.update()
 
     def resize_grid(self, new_size):
+        if new_size == self.grid_size:
+            return  # Spinbox-Echo - nichts kopieren, nichts snapshotten
         self.save_state()
         old_size = self.grid_size
         self.grid_size = new_size
         self.virtual_size = new_size * 3
+        self._virtual_offset = new_size
 
         old_offset = old_size
         new_offset = self.get_virtual_offset()
 
         for layer in self.layers:
             # Extract visible content from old virtual canvas
-            visible_content = layer.pixmap.copy(old_offset, old_offset, old_size, old_size)
+            visible_content = layer.qimage.copy(old_offset, old_offset, old_size, old_size)
 
             # Create new virtual canvas
-            new_pixmap = QPixmap(self.virtual_size, self.virtual_size)
-            new_pixmap.fill(Qt.GlobalColor.transparent)
+            layer.replace_data(np.zeros((self.virtual_size, self.virtual_size), dtype=np.uint32))
 
             # Paint old content centered in new canvas
-            painter = QPainter(new_pixmap)
+            painter = QPainter(layer.qimage)
 
             # Calculate position to maintain content
             content_x = new_offset + (new_size - old_size) // 2
@@ -871,11 +1379,11 @@ class PixelCanvas(QWidget):
                 painter.fillRect(new_offset, new_offset, new_size, new_size, Qt.GlobalColor.white)
 
             # Draw old content
-            painter.drawPixmap(content_x, content_y, visible_content)
+            painter.drawImage(content_x, content_y, visible_content)
             painter.end()
+            layer.mark_dirty()
 
-            layer.pixmap = new_pixmap
-
+        self.invalidate_composite()
         self.update_size()
         self.update()
 
@@ -891,11 +1399,12 @@ class PixelCanvas(QWidget):
             new_width = int(image.width() * scale)
             new_height = int(image.height() * scale)
 
-            # Scale image
+            # Scale image - nearest neighbor: keeps pixel-art edges hard
+            # and skips the much slower bilinear filter
             scaled = image.scaled(
                 new_width, new_height,
                 Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
+                Qt.TransformationMode.FastTransformation
             )
 
             # Center in grid
@@ -904,51 +1413,188 @@ class PixelCanvas(QWidget):
             y_offset = offset + (self.grid_size - new_height) // 2
 
             # Clear and draw
-            self.layers[self.current_layer].pixmap.fill(Qt.GlobalColor.transparent)
-            painter = QPainter(self.layers[self.current_layer].pixmap)
+            layer = self.layers[self.current_layer]
+            layer.data.fill(0)
+            painter = QPainter(layer.qimage)
             painter.drawImage(x_offset, y_offset, scaled)
             painter.end()
+            layer.mark_dirty()
+            self.invalidate_composite()
             self.update()
 
+    # Strip height for parallel compositing - one strip per worker keeps
+    # each slice small enough to stay cache-resident
+    COMPOSITE_STRIP = 64
+
+    def _composite_over(self, indices, x0, y0, width, height, out):
+        """Porter-Duff-Over der angegebenen Ebenen in NumPy
+
+        Komponiert das width*height-Rechteck ab (x0, y0) von unten nach
+        oben in das uint32-Array out. Grosse Flächen werden in
+        horizontale Streifen zerlegt und über einen Thread-Pool
+        gemischt - die Streifen schreiben in disjunkte Views, NumPy gibt
+        das GIL frei.
+        """
+        # Parallel arrays statt Layer-Objekten im Streifen-Closure - die
+        # Attribut-Zugriffe passieren einmal, nicht pro Streifen
+        buffers = [self.layers[idx].data for idx in indices]
+        opacities = [int(self.layers[idx].opacity * 255) for idx in indices]
+
+        def blend_strip(r0, r1):
+            h = r1 - r0
+            dst = np.zeros((4, h, width), dtype=np.uint16)
+            for data, opacity in zip(buffers, opacities):
+                src = data[y0 + r0:y0 + r1, x0:x0 + width]
+                a = ((src >> 24) & 0xFF).astype(np.uint16)
+                r = ((src >> 16) & 0xFF).astype(np.uint16)
+                g = ((src >> 8) & 0xFF).astype(np.uint16)
+                b = (src & 0xFF).astype(np.uint16)
+                if opacity < 255:
+                    # Premultiplied: opacity scales all four channels
+                    a = a * opacity // 255
+                    r = r * opacity // 255
+                    g = g * opacity // 255
+                    b = b * opacity // 255
+                inv = 255 - a
+                dst[0] = a + dst[0] * inv // 255
+                dst[1] = r + dst[1] * inv // 255
+                dst[2] = g + dst[2] * inv // 255
+                dst[3] = b + dst[3] * inv // 255
+            dst32 = dst.astype(np.uint32)
+            out[r0:r1] = (dst32[0] << 24) | (dst32[1] << 16) | \
+                         (dst32[2] << 8) | dst32[3]
+
+        strip = self.COMPOSITE_STRIP
+        if height < 2 * strip:
+            blend_strip(0, height)
+            return
+
+        bounds = list(range(0, height, strip)) + [height]
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            for future in [pool.submit(blend_strip, bounds[i], bounds[i + 1])
+                           for i in range(len(bounds) - 1)]:
+                future.result()
+
+    def _occupied_bbox(self, indices):
+        """Vereinigte Bounding-Box der belegten Pixel der Ebenen indices"""
+        bbox = None
+        for idx in indices:
+            layer_bbox = self.layers[idx].content_bbox()
+            if layer_bbox is None:
+                continue
+            bbox = layer_bbox if bbox is None else bbox.united(layer_bbox)
+        return bbox
+
     def export_image(self):
         """Export only the visible area"""
         offset = self.get_virtual_offset()
-        final_image = QPixmap(self.grid_size, self.grid_size)
-        final_image.fill(Qt.GlobalColor.transparent)
+        grid = self.grid_size
+
+        # Compose in RAM with the NumPy over-operator, convert to a
+        # pixmap once at the end
+        out = np.zeros((grid, grid), dtype=np.uint32)
+        indices = [i for i, layer in enumerate(self.layers) if layer.visible]
+
+        # Only blend the occupied part of the visible area; the rest of
+        # the output stays transparent without being touched
+        bbox = self._occupied_bbox(indices)
+        if bbox is not None:
+            bbox = bbox.intersected(QRect(offset, offset, grid, grid))
+        if bbox is not None and not bbox.isEmpty():
+            self._composite_over(
+                indices, bbox.x(), bbox.y(), bbox.width(), bbox.height(),
+                out[bbox.y() - offset:bbox.y() - offset + bbox.height(),
+                    bbox.x() - offset:bbox.x() - offset + bbox.width()])
+
+        image = QImage(out.tobytes(), grid, grid, grid * 4,
+                       QImage.Format.Format_ARGB32_Premultiplied)
+        # copy() detaches from the local byte buffer before it goes away
+        return QPixmap.fromImage(image.copy())
 
-        painter = QPainter(final_image)
-        for layer in self.layers:
-            if layer.visible:
-                painter.setOpacity(layer.opacity)
-                # Extract only visible area
-                visible_area = layer.pixmap.copy(offset, offset, self.grid_size, self.grid_size)
-                painter.drawPixmap(0, 0, visible_area)
-        painter.end()
+    def save_project(self, filename):
+        """Save entire project as a zip container
 
-        return final_image
+        project.json (orjson, kein Pretty-Printing) hält nur Metadaten;
+        die Pixeldaten jeder Ebene liegen als zlib-komprimierte Binär-
+        Sidecars daneben - kein Base64, kein zeichenweises json.dump
+        über Megabytes von Pixeldaten.
+        """
+        # Erst beim Speichern laden - hält die C-Extension aus dem Kaltstart
+        import orjson
 
-    def save_project(self, filename):
-        """Save entire project as JSON"""
-        project_data = {
+        meta = {
             'grid_size': self.grid_size,
-            'layers': [layer.to_dict() for layer in self.layers],
-            'current_layer': self.current_layer
+            'current_layer': self.current_layer,
+            'layers': []
         }
 
-        with open(filename, 'w') as f:
-            json.dump(project_data, f, indent=2)
+        # zlib gibt das GIL frei - die Ebenen komprimieren parallel, nur
+        # das Zusammensetzen des Archivs bleibt seriell
+        with ThreadPoolExecutor() as pool:
+            blobs = list(pool.map(
+                lambda layer: zlib.compress(layer.data.tobytes(), 1),
+                self.layers))
+
+        with zipfile.ZipFile(filename, 'w', zipfile.ZIP_STORED) as zf:
+            for i, layer in enumerate(self.layers):
+                height, width = layer.data.shape
+                blob_name = f'layer_{i}.bin'
+                zf.writestr(blob_name, blobs[i])
+                meta['layers'].append({
+                    'name': layer.name,
+                    'file': blob_name,
+                    'width': width,
+                    'height': height,
+                    'visible': layer.visible,
+                    'opacity': layer.opacity
+                })
+            zf.writestr('project.json', orjson.dumps(meta))
 
     def load_project(self, filename):
-        """Load project from JSON"""
-        with open(filename, 'r') as f:
-            project_data = json.load(f)
+        """Load project from the zip container (or legacy JSON)"""
+        if zipfile.is_zipfile(filename):
+            import orjson
+            with zipfile.ZipFile(filename) as zf:
+                meta = orjson.loads(zf.read('project.json'))
+                raw = [zf.read(entry['file']) for entry in meta['layers']]
+
+            def decode(entry, blob):
+                return np.frombuffer(
+                    zlib.decompress(blob), dtype=np.uint32
+                ).reshape(entry['height'], entry['width']).copy()
+
+            # Decompress in parallel as well, mirror of save_project
+            with ThreadPoolExecutor() as pool:
+                arrays = list(pool.map(decode, meta['layers'], raw))
+
+            layers = [Layer(entry['name'], arr,
+                            visible=entry['visible'],
+                            opacity=entry['opacity'])
+                      for entry, arr in zip(meta['layers'], arrays)]
+        else:
+            # Ältere Projektdateien: ein einziges JSON-Dokument
+            with open(filename, 'r') as f:
+                meta = json.load(f)
+            layers = [Layer.from_dict(layer_data) for layer_data in meta['layers']]
 
-        self.grid_size = project_data['grid_size']
+        self.grid_size = meta['grid_size']
         self.virtual_size = self.grid_size * 3
-        self.layers = [Layer.from_dict(layer_data) for layer_data in project_data['layers']]
-        self.current_layer = project_data['current_layer']
+        self._virtual_offset = self.grid_size
+        self.layers = layers
+        self.current_layer = meta['current_layer']
+
+        # Undo-Historie verwerfen wie in reset_all: der alte Cursor gehört
+        # zur vorherigen Ebenen-Generation, und deren Epochen würden mit
+        # den frisch bei 0 startenden Layern aliasieren
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self._undo_cursor = None
+        self._undo_cursor_meta = None
 
+        self.invalidate_composite()
         self.update_size()
+        # Den geladenen Stand als Undo-Boden festschreiben
+        self.save_state()
         self.update()
 
     def rotate_layer(self, angle):
@@ -960,8 +1606,21 @@ class PixelCanvas(QWidget):
         current_layer = self.layers[self.current_layer]
         offset = self.get_virtual_offset()
 
-        # Extract visible area
-        visible_area = current_layer.pixmap.copy(offset, offset, self.grid_size, self.grid_size)
+        # Multiples of 90 degrees are pure index permutations - rotate the
+        # square visible slice in place, no resampling, no QTransform
+        if angle % 90 == 0:
+            k = -(int(angle) // 90) % 4
+            if k:
+                view = current_layer.data[offset:offset + self.grid_size,
+                                          offset:offset + self.grid_size]
+                view[:] = np.rot90(view, k).copy()
+                current_layer.mark_dirty()
+                self.invalidate_composite()
+            self.update()
+            return
+
+        # Extract visible area - QImage copy, stays off the backing store
+        visible_area = current_layer.qimage.copy(offset, offset, self.grid_size, self.grid_size)
 
         # Create transform
         transform = QTransform()
@@ -978,17 +1637,18 @@ class PixelCanvas(QWidget):
         rotated = visible_area.transformed(transform, transformation_mode)
 
         # Clear the visible area in the layer
-        painter = QPainter(current_layer.pixmap)
-        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
-        painter.fillRect(offset, offset, self.grid_size, self.grid_size, Qt.GlobalColor.transparent)
-        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+        self.layers[self.current_layer].data[
+            offset:offset + self.grid_size, offset:offset + self.grid_size] = 0
 
+        painter = QPainter(current_layer.qimage)
         # Calculate new position to center the rotated image
         new_x = offset + (self.grid_size - rotated.width()) // 2
         new_y = offset + (self.grid_size - rotated.height()) // 2
-        painter.drawPixmap(new_x, new_y, rotated)
+        painter.drawImage(new_x, new_y, rotated)
         painter.end()
 
+        current_layer.mark_dirty()
+        self.invalidate_composite()
         self.update()
 
     def set_smooth_rotation(self, enabled):
@@ -1002,27 +1662,15 @@ class PixelCanvas(QWidget):
         current_layer = self.layers[self.current_layer]
         offset = self.get_virtual_offset()
 
-        # Extract visible area
-        visible_area = current_layer.pixmap.copy(offset, offset, self.grid_size, self.grid_size)
-
-        # Create transform
-        transform = QTransform()
+        # Flip is a pure axis reversal on the visible buffer slice
+        view = current_layer.data[offset:offset + self.grid_size, offset:offset + self.grid_size]
         if horizontal:
-            transform.scale(-1, 1)
-            transform.translate(-visible_area.width(), 0)
+            view[:] = view[:, ::-1].copy()
         else:
-            transform.scale(1, -1)
-            transform.translate(0, -visible_area.height())
-
-        # Flip the visible area
-        flipped = visible_area.transformed(transform, Qt.TransformationMode.FastTransformation)
-
-        # Clear and redraw
-        painter = QPainter(current_layer.pixmap)
-        painter.fillRect(offset, offset, self.grid_size, self.grid_size, Qt.GlobalColor.transparent)
-        painter.drawPixmap(offset, offset, flipped)
-        painter.end()
+            view[:] = view[::-1, :].copy()
 
+        current_layer.mark_dirty()
+        self.invalidate_composite()
         self.update()
 
     def merge_selected_layers(self):
@@ -1036,30 +1684,29 @@ class PixelCanvas(QWidget):
 
         self.save_state()
 
-        # Create new merged pixmap
-        merged_pixmap = QPixmap(self.virtual_size, self.virtual_size)
-        merged_pixmap.fill(Qt.GlobalColor.transparent)
-
-        painter = QPainter(merged_pixmap)
-
-        # Draw selected layers from bottom to top
-        for idx in selected_indices:
-            if self.layers[idx].visible:
-                painter.setOpacity(self.layers[idx].opacity)
-                painter.drawPixmap(0, 0, self.layers[idx].pixmap)
-
-        painter.end()
-
         # Create new layer with merged content
         base_names = [self.layers[i].name for i in selected_indices]
         merged_name = f"Merged ({', '.join(base_names[:3])}{'...' if len(base_names) > 3 else ''})"
 
+        new_layer = Layer.create(merged_name, self.virtual_size)
+
+        # Blend selected layers bottom-to-top straight into the new
+        # layer's buffer, restricted to the union bounding box of their
+        # occupied pixels - no pass over the empty virtual border
+        visible = [i for i in selected_indices if self.layers[i].visible]
+        bbox = self._occupied_bbox(visible)
+        if bbox is not None:
+            self._composite_over(
+                visible, bbox.x(), bbox.y(), bbox.width(), bbox.height(),
+                new_layer.data[bbox.y():bbox.y() + bbox.height(),
+                               bbox.x():bbox.x() + bbox.width()])
+        new_layer.mark_dirty()
+
         # Remove selected layers (from top to bottom to maintain indices)
         for idx in reversed(selected_indices):
             del self.layers[idx]
 
         # Add merged layer
-        new_layer = Layer(merged_name, merged_pixmap)
         self.layers.insert(min(selected_indices), new_layer)
 
         # Update current layer
@@ -1069,6 +1716,7 @@ class PixelCanvas(QWidget):
         for layer in self.layers:
             layer.selected = False
 
+        self.invalidate_composite()
         self.update()
 
 
@@ -1083,6 +1731,14 @@ class ColorPalette(QWidget):
         self.selected_is_user = False
         self.cell_size = 24
         self.columns = 10  # Increased from 8 to 10
+
+        # Stifte und Zellen-Rechteck einmal anlegen - paintEvent erzeugt
+        # sonst pro Durchlauf über 50 kurzlebige QPen/QRect-Objekte
+        self._pen_sep = QPen(QColor(180, 180, 180), 2)
+        self._pen_sel = QPen(Qt.GlobalColor.black, 2)
+        self._pen_border = QPen(Qt.GlobalColor.gray, 1)
+        self._cell_rect = QRect(0, 0, self.cell_size, self.cell_size)
+
         self.load_material_palette()
 
     def load_material_palette(self):
@@ -1098,7 +1754,7 @@ class ColorPalette(QWidget):
             "#616161", "#424242", "#303030", "#212121"
         ]
 
-        self.material_colors = [QColor(c) for c in material_colors]
+        self.material_colors = [palette_color(c) for c in material_colors]
 
         # Initialize user colors with transparent
         self.user_colors = [QColor(0, 0, 0, 0) for _ in range(20)]  # 20 user color slots
@@ -1113,118 +1769,152 @@ class ColorPalette(QWidget):
         width = self.columns * self.cell_size
         height = total_rows * self.cell_size + 10  # +10 for separator space
         self.setFixedSize(width, height)
+        self._separator_y = material_rows * self.cell_size + 5
+        self._build_cell_pixmaps()
+        self._build_hit_regions(material_rows)
+        self._palette_pixmap = None
+
+    def _build_cell_pixmaps(self):
+        """Schachbrett- und Plus-Kacheln einmal vorzeichnen statt pro Zelle"""
+        size = self.cell_size
+        half = size // 2
+
+        self._checker_pix = QPixmap(size, size)
+        painter = QPainter(self._checker_pix)
+        painter.fillRect(0, 0, size, size, QColor(255, 255, 255))
+        painter.fillRect(0, 0, half, half, QColor(200, 200, 200))
+        painter.fillRect(half, half, half, half, QColor(200, 200, 200))
+        painter.end()
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-
-        # Draw material colors
-        for i, color in enumerate(self.material_colors):
-            row = i // self.columns
-            col = i % self.columns
-            x = col * self.cell_size
-            y = row * self.cell_size
-
-            self.draw_color_cell(painter, x, y, color, i == self.selected_index and not self.selected_is_user)
-
-        # Draw separator
-        separator_y = ((len(self.material_colors) + self.columns - 1) // self.columns) * self.cell_size + 5
-        painter.setPen(QPen(QColor(180, 180, 180), 2))
-        painter.drawLine(0, separator_y, self.width(), separator_y)
+        self._plus_pix = QPixmap(size, size)
+        self._plus_pix.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(self._plus_pix)
+        painter.setPen(QPen(QColor(150, 150, 150), 2))
+        third = size // 3
+        painter.drawLine(half - third, half, half + third, half)
+        painter.drawLine(half, half - third, half, half + third)
+        painter.end()
 
-        # Draw user colors
-        user_start_y = separator_y + 10
-        for i, color in enumerate(self.user_colors):
-            row = i // self.columns
-            col = i % self.columns
-            x = col * self.cell_size
-            y = user_start_y + row * self.cell_size
+    def _build_hit_regions(self, material_rows):
+        """Zelle→(Bereich, Index)-Tabelle einmal aufbauen
+
+        mousePressEvent schlägt damit nur noch nach, statt Zeilen- und
+        Separator-Arithmetik pro Klick neu herzuleiten.
+        """
+        cs = self.cell_size
+        self._hit_regions = []
+        for i in range(len(self.material_colors)):
+            rect = QRect((i % self.columns) * cs, (i // self.columns) * cs, cs, cs)
+            self._hit_regions.append((rect, 'material', i))
+        user_y0 = material_rows * cs + 10
+        for i in range(len(self.user_colors)):
+            rect = QRect((i % self.columns) * cs,
+                         user_y0 + (i // self.columns) * cs, cs, cs)
+            self._hit_regions.append((rect, 'user', i))
+
+    def _palette_base(self):
+        """Alle Zellen plus Separator als statisches Bild
+
+        Die Palette ändert sich nur bei add_color/import/Farbdialog -
+        bis dahin ist jeder Repaint ein einziger drawPixmap-Blit statt
+        100+ fillRect/drawRect-Aufrufe.
+        """
+        if self._palette_pixmap is None:
+            pix = QPixmap(self.size())
+            pix.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pix)
+            for rect, section, index in self._hit_regions:
+                color = (self.user_colors[index] if section == 'user'
+                         else self.material_colors[index])
+                self.draw_color_cell(painter, rect.x(), rect.y(), color,
+                                     False, section == 'user')
+            painter.setPen(self._pen_sep)
+            painter.drawLine(0, self._separator_y, self.width(), self._separator_y)
+            painter.end()
+            self._palette_pixmap = pix
+        return self._palette_pixmap
 
-            # Mark this as user color area for draw_color_cell
-            self.selected_is_user = True
-            self.draw_color_cell(painter, x, y, color, i == self.selected_index and self.selected_is_user)
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._palette_base())
+
+        # Nur der Auswahlrahmen wird pro Repaint gezeichnet
+        want = 'user' if self.selected_is_user else 'material'
+        for rect, section, index in self._hit_regions:
+            if section == want and index == self.selected_index:
+                cell = self._cell_rect
+                cell.moveTo(rect.x(), rect.y())
+                painter.setPen(self._pen_sel)
+                painter.drawRect(cell)
+                break
 
-    def draw_color_cell(self, painter, x, y, color, selected):
-        rect = QRect(x, y, self.cell_size, self.cell_size)
+    def draw_color_cell(self, painter, x, y, color, selected, is_user=False):
+        rect = self._cell_rect
+        rect.moveTo(x, y)
 
-        # Draw transparency pattern for transparent/empty colors
+        # Draw transparency pattern for transparent/empty colors - one blit
+        # of the cached checker tile instead of three fillRects
         if color.alpha() < 255:
-            painter.fillRect(rect, QColor(255, 255, 255))
-            painter.fillRect(QRect(x, y, self.cell_size // 2, self.cell_size // 2), QColor(200, 200, 200))
-            painter.fillRect(QRect(x + self.cell_size // 2, y + self.cell_size // 2,
-                                   self.cell_size // 2, self.cell_size // 2), QColor(200, 200, 200))
+            painter.drawPixmap(x, y, self._checker_pix)
 
         painter.fillRect(rect, color)
 
         # Draw "+" for empty user slots
-        if color.alpha() == 0 and hasattr(self, 'selected_is_user'):
-            painter.setPen(QPen(QColor(150, 150, 150), 2))
-            center_x = x + self.cell_size // 2
-            center_y = y + self.cell_size // 2
-            size = self.cell_size // 3
-            painter.drawLine(center_x - size, center_y, center_x + size, center_y)
-            painter.drawLine(center_x, center_y - size, center_x, center_y + size)
-
-        if selected:
-            painter.setPen(QPen(Qt.GlobalColor.black, 2))
-            painter.drawRect(rect)
-        else:
-            painter.setPen(QPen(Qt.GlobalColor.gray, 1))
-            painter.drawRect(rect)
+        if color.alpha() == 0 and is_user:
+            painter.drawPixmap(x, y, self._plus_pix)
+
+        painter.setPen(self._pen_sel if selected else self._pen_border)
+        painter.drawRect(rect)
 
     def mousePressEvent(self, event):
-        x = event.pos().x() // self.cell_size
-        y = event.pos().y() // self.cell_size
+        hit = None
+        for rect, section, index in self._hit_regions:
+            if rect.contains(event.pos()):
+                hit = (section, index)
+                break
+        if hit is None:
+            return
+        section, index = hit
 
-        # Check if in material colors
-        material_rows = (len(self.material_colors) + self.columns - 1) // self.columns
-        if y < material_rows:
-            index = y * self.columns + x
-            if 0 <= index < len(self.material_colors):
-                self.selected_index = index
-                self.selected_is_user = False
-                self.colorSelected.emit(self.material_colors[index])
-                self.update()
+        if section == 'material':
+            self.selected_index = index
+            self.selected_is_user = False
+            self.colorSelected.emit(self.material_colors[index])
+            self.update()
+            return
+
+        self.selected_index = index
+        self.selected_is_user = True
+
+        # Right-click and Ctrl+Click both open the color editor
+        if event.button() == Qt.MouseButton.RightButton or (
+                event.button() == Qt.MouseButton.LeftButton
+                and event.modifiers() & Qt.KeyboardModifier.ControlModifier):
+            self._edit_user_color(index)
         else:
-            # Check if in user colors
-            separator_rows = material_rows * self.cell_size + 10
-            user_y = (event.pos().y() - separator_rows) // self.cell_size
-            if user_y >= 0:
-                index = user_y * self.columns + x
-                if 0 <= index < len(self.user_colors):
-                    self.selected_index = index
-                    self.selected_is_user = True
-
-                    if event.button() == Qt.MouseButton.RightButton:
-                        # Right-click to set new color
-                        color = QColorDialog.getColor(
-                            self.user_colors[index], self,
-                            "Choose Color",
-                            QColorDialog.ColorDialogOption.ShowAlphaChannel
-                        )
-                        if color.isValid():
-                            self.user_colors[index] = color
-                            self.colorSelected.emit(color)
-                    elif event.button() == Qt.MouseButton.LeftButton and event.modifiers() & Qt.KeyboardModifier.ControlModifier:
-                        # Ctrl+Click to set new color (alternative)
-                        color = QColorDialog.getColor(
-                            self.user_colors[index], self,
-                            "Choose Color",
-                            QColorDialog.ColorDialogOption.ShowAlphaChannel
-                        )
-                        if color.isValid():
-                            self.user_colors[index] = color
-                            self.colorSelected.emit(color)
-                    else:
-                        # Normal click to select color
-                        if self.user_colors[index].alpha() > 0:  # Only select if not empty
-                            self.colorSelected.emit(self.user_colors[index])
-                    self.update()
+            # Normal click to select color
+            if self.user_colors[index].alpha() > 0:  # Only select if not empty
+                self.colorSelected.emit(self.user_colors[index])
+        self.update()
+
+    def _edit_user_color(self, index):
+        """Farbdialog für einen User-Slot öffnen und das Ergebnis übernehmen"""
+        color = QColorDialog.getColor(
+            self.user_colors[index], self,
+            "Choose Color",
+            QColorDialog.ColorDialogOption.ShowAlphaChannel
+        )
+        if color.isValid():
+            self.user_colors[index] = color
+            self._palette_pixmap = None
+            self.colorSelected.emit(color)
 
     def add_color(self, color):
         # Add to first empty user slot
         for i, c in enumerate(self.user_colors):
             if c.alpha() == 0:
                 self.user_colors[i] = color
+                self._palette_pixmap = None
                 self.update()
                 break
 
@@ -1237,12 +1927,12 @@ class ColorPalette(QWidget):
     def import_palette(self, palette_data):
         if isinstance(palette_data, dict):
             if 'material' in palette_data:
-                self.material_colors = [QColor(c) for c in palette_data['material']]
+                self.material_colors = [palette_color(c) for c in palette_data['material']]
             if 'user' in palette_data:
-                self.user_colors = [QColor(c) for c in palette_data['user']]
+                self.user_colors = [palette_color(c) for c in palette_data['user']]
         else:
             # Legacy format
-            self.material_colors = [QColor(c) for c in palette_data]
+            self.material_colors = [palette_color(c) for c in palette_data]
         self.update_size()
         self.update()
 
@@ -1308,6 +1998,11 @@ class MacroDialog(QDialog):
 
 
 class PixelEditor(QMainWindow):
+    # Einmal definierte Templates statt f-Strings pro Farbwechsel
+    _PRIMARY_CSS = ("background-color: rgba({}, {}, {}, {}); "
+                    "border: 2px solid #888888;")
+    _SECONDARY_CSS = "background-color: rgba({}, {}, {}, {})"
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Professional Pixel Editor")
@@ -1318,6 +2013,47 @@ class PixelEditor(QMainWindow):
             self.setUnifiedTitleAndToolBarOnMac(True)
 
         self.canvas = PixelCanvas()
+
+        # Coalesces slider ticks of the rotation preview to one render
+        # per frame (~60 Hz)
+        self._pending_rotation_angle = 0
+        self._rotation_preview_timer = QTimer(self)
+        self._rotation_preview_timer.setSingleShot(True)
+        self._rotation_preview_timer.setInterval(16)
+        self._rotation_preview_timer.timeout.connect(self._do_preview_rotation)
+
+        # Same idea for opacity-slider floods: state changes land sofort,
+        # Repaint und Listen-Refresh höchstens einmal pro Frame
+        self._canvas_update_timer = QTimer(self)
+        self._canvas_update_timer.setSingleShot(True)
+        self._canvas_update_timer.setInterval(16)
+        self._canvas_update_timer.timeout.connect(self._flush_canvas_update)
+
+        # Beim Eintippen einer Rastergröße feuert valueChanged pro Ziffer
+        # (1 → 12 → 128); der Resize reallokiert alle Ebenen und läuft
+        # darum entprellt bzw. sofort bei editingFinished
+        self._grid_resize_timer = QTimer(self)
+        self._grid_resize_timer.setSingleShot(True)
+        self._grid_resize_timer.setInterval(150)
+        self._grid_resize_timer.timeout.connect(self._apply_grid_size)
+
+        # Letzte Button-Farben, um redundante setStyleSheet-Aufrufe
+        # (Style-Reparse + Cache-Invalidierung) zu überspringen
+        self._last_primary = None
+        self._last_secondary = None
+
+        # Schachbrett-Hintergrund und fertige Alpha-Icons wiederverwenden
+        self._checker_bg = None
+        self._alpha_icon_cache = {}
+
+        # Serialisierter Stand der zuletzt geladenen/geschriebenen
+        # Settings - unveränderte Settings werden nicht neu geschrieben
+        self._last_settings_payload = None
+
+        # Einmal gebaut, danach wiederverwendet
+        self._macro_dialog = None
+        self._file_dialog = None
+
         self.setup_ui()
         self.setup_shortcuts()
         self.load_settings()
@@ -1336,6 +2072,9 @@ class PixelEditor(QMainWindow):
 
         if ok and new_name:
             self.canvas.layers[row].name = new_name
+            # Meta-Änderung fürs Undo-Gerüst sichtbar machen, sonst
+            # faltet der nächste save_state sie in den folgenden Strich
+            self.canvas._dirty_since_last_save = True
             self.update_layers_list()
 
     def create_layer_context_menu(self, position):
@@ -1347,14 +2086,15 @@ class PixelEditor(QMainWindow):
         menu = QMenu(self)
 
         rename_action = QAction("Rename", self)
-        rename_action.triggered.connect(lambda: self.rename_layer_dialog(item))
+        rename_action.triggered.connect(partial(self.rename_layer_dialog, item))
         menu.addAction(rename_action)
 
         # Optional: Weitere Aktionen
         menu.addSeparator()
 
         duplicate_action = QAction("Duplicate", self)
-        duplicate_action.triggered.connect(lambda: self.duplicate_layer(self.layers_list.row(item)))
+        duplicate_action.triggered.connect(
+            partial(self.duplicate_layer, self.layers_list.row(item)))
         menu.addAction(duplicate_action)
 
         menu.exec(self.layers_list.mapToGlobal(position))
@@ -1365,13 +2105,13 @@ class PixelEditor(QMainWindow):
             original = self.canvas.layers[index]
 
             # Create new layer with copied content
-            new_pixmap = original.pixmap.copy()
             new_name = f"{original.name} copy"
-            new_layer = Layer(new_name, new_pixmap, original.visible, original.opacity)
+            new_layer = Layer(new_name, original.data.copy(), original.visible, original.opacity)
 
             # Insert after original
             self.canvas.layers.insert(index + 1, new_layer)
             self.canvas.current_layer = index + 1
+            self.canvas.invalidate_composite()
             self.update_layers_list()
 
     def setup_ui(self):
@@ -1473,6 +2213,7 @@ class PixelEditor(QMainWindow):
         self.grid_spin.setValue(32)
         self.grid_spin.setSuffix("px")
         self.grid_spin.valueChanged.connect(self.change_grid_size)
+        self.grid_spin.editingFinished.connect(self._apply_grid_size)
         toolbar.addWidget(self.grid_spin)
 
         toolbar.addSeparator()
@@ -1504,7 +2245,8 @@ class PixelEditor(QMainWindow):
         self.rotation_slider.setFixedWidth(200)
         self.rotation_slider.setTickInterval(45)
         self.rotation_slider.setTickPosition(QSlider.TickPosition.TicksBelow)
-        self.rotation_slider.sliderPressed.connect(lambda: setattr(self.canvas, 'rotation_preview_active', True))
+        self.rotation_slider.sliderPressed.connect(
+            partial(setattr, self.canvas, 'rotation_preview_active', True))
         self.rotation_slider.valueChanged.connect(self.preview_rotation)
         self.rotation_slider.sliderReleased.connect(self.apply_rotation)
         transform_toolbar.addWidget(self.rotation_slider)
@@ -1517,26 +2259,26 @@ class PixelEditor(QMainWindow):
 
         # Quick rotation buttons
         rot_90_btn = QPushButton("↻ 90°")
-        rot_90_btn.clicked.connect(lambda: self.quick_rotate(90))
+        rot_90_btn.clicked.connect(partial(self.quick_rotate, 90))
         transform_toolbar.addWidget(rot_90_btn)
 
         rot_neg90_btn = QPushButton("↺ 90°")
-        rot_neg90_btn.clicked.connect(lambda: self.quick_rotate(-90))
+        rot_neg90_btn.clicked.connect(partial(self.quick_rotate, -90))
         transform_toolbar.addWidget(rot_neg90_btn)
 
         rot_180_btn = QPushButton("↕ 180°")
-        rot_180_btn.clicked.connect(lambda: self.quick_rotate(180))
+        rot_180_btn.clicked.connect(partial(self.quick_rotate, 180))
         transform_toolbar.addWidget(rot_180_btn)
 
         transform_toolbar.addSeparator()
 
         # Flip buttons
         flip_h_btn = QPushButton("↔ Flip H")
-        flip_h_btn.clicked.connect(lambda: self.canvas.flip_layer(True))
+        flip_h_btn.clicked.connect(partial(self.canvas.flip_layer, True))
         transform_toolbar.addWidget(flip_h_btn)
 
         flip_v_btn = QPushButton("↕ Flip V")
-        flip_v_btn.clicked.connect(lambda: self.canvas.flip_layer(False))
+        flip_v_btn.clicked.connect(partial(self.canvas.flip_layer, False))
         transform_toolbar.addWidget(flip_v_btn)
 
         transform_toolbar.addSeparator()
@@ -1596,7 +2338,7 @@ class PixelEditor(QMainWindow):
 
         for i, (icon_name, fallback, mode, tooltip) in enumerate(tools):
             btn = IconToolButton(icon_name, fallback, tooltip)
-            btn.clicked.connect(lambda checked, m=mode: self.set_draw_mode(m))
+            btn.clicked.connect(partial(self.set_draw_mode, mode))
             self.tool_buttons.addButton(btn)
             tools_layout.addWidget(btn, i // 2, i % 2)
 
@@ -1725,144 +2467,99 @@ class PixelEditor(QMainWindow):
 
         return panel
 
-    def create_menu_bar(self):
-        menubar = self.menuBar()
-
-        # File menu
-        file_menu = menubar.addMenu("File")
-
-        new_action = QAction("New", self)
-        new_action.setShortcut(QKeySequence.StandardKey.New)
-        new_action.triggered.connect(self.new_file)
-        file_menu.addAction(new_action)
-
-        open_action = QAction("Open", self)
-        open_action.setShortcut(QKeySequence.StandardKey.Open)
-        open_action.triggered.connect(self.open_file)
-        file_menu.addAction(open_action)
-
-        save_action = QAction("Save", self)
-        save_action.setShortcut(QKeySequence.StandardKey.Save)
-        save_action.triggered.connect(self.save_file)
-        file_menu.addAction(save_action)
-
-        file_menu.addSeparator()
-
-        save_project_action = QAction("Save Project", self)
-        save_project_action.triggered.connect(self.save_project)
-        file_menu.addAction(save_project_action)
-
-        load_project_action = QAction("Load Project", self)
-        load_project_action.triggered.connect(self.load_project)
-        file_menu.addAction(load_project_action)
-
-        file_menu.addSeparator()
-
-        export_action = QAction("Export as PNG", self)
-        export_action.triggered.connect(self.export_png)
-        file_menu.addAction(export_action)
-
-        export_ico_action = QAction("Export as ICO", self)
-        export_ico_action.triggered.connect(self.export_ico)
-        file_menu.addAction(export_ico_action)
-
-        # Edit menu
-        edit_menu = menubar.addMenu("Edit")
-
-        undo_action = QAction("Undo", self)
-        undo_action.setShortcut(QKeySequence.StandardKey.Undo)
-        undo_action.triggered.connect(self.canvas.undo)
-        edit_menu.addAction(undo_action)
-
-        redo_action = QAction("Redo", self)
-        redo_action.setShortcut(QKeySequence.StandardKey.Redo)
-        redo_action.triggered.connect(self.canvas.redo)
-        edit_menu.addAction(redo_action)
-
-        edit_menu.addSeparator()
-
-        # Transform submenu
-        transform_menu = edit_menu.addMenu("Transform")
-
-        rotate_90_action = QAction("Rotate 90° CW", self)
-        rotate_90_action.setShortcut("Ctrl+R")
-        rotate_90_action.triggered.connect(lambda: self.canvas.rotate_layer(90))
-        transform_menu.addAction(rotate_90_action)
-
-        rotate_neg90_action = QAction("Rotate 90° CCW", self)
-        rotate_neg90_action.setShortcut("Ctrl+Shift+R")
-        rotate_neg90_action.triggered.connect(lambda: self.canvas.rotate_layer(-90))
-        transform_menu.addAction(rotate_neg90_action)
-
-        rotate_180_action = QAction("Rotate 180°", self)
-        rotate_180_action.triggered.connect(lambda: self.canvas.rotate_layer(180))
-        transform_menu.addAction(rotate_180_action)
-
-        transform_menu.addSeparator()
-
-        flip_h_action = QAction("Flip Horizontal", self)
-        flip_h_action.setShortcut("Ctrl+H")
-        flip_h_action.triggered.connect(lambda: self.canvas.flip_layer(True))
-        transform_menu.addAction(flip_h_action)
-
-        flip_v_action = QAction("Flip Vertical", self)
-        flip_v_action.setShortcut("Ctrl+Shift+H")
-        flip_v_action.triggered.connect(lambda: self.canvas.flip_layer(False))
-        transform_menu.addAction(flip_v_action)
-
-        edit_menu.addSeparator()
-
-        clear_layer_action = QAction("Clear Layer", self)
-        clear_layer_action.triggered.connect(self.canvas.clear_layer)
-        edit_menu.addAction(clear_layer_action)
-
-        merge_layers_action = QAction("Merge Selected Layers", self)
-        merge_layers_action.setShortcut("Ctrl+E")
-        merge_layers_action.triggered.connect(self.merge_layers)
-        edit_menu.addAction(merge_layers_action)
-
-        reset_all_action = QAction("Reset All", self)
-        reset_all_action.triggered.connect(self.canvas.reset_all)
-        edit_menu.addAction(reset_all_action)
-
-        # View menu
-        view_menu = menubar.addMenu("View")
-
-        toggle_grid_action = QAction("Toggle Grid", self)
-        toggle_grid_action.setCheckable(True)
-        toggle_grid_action.setChecked(True)
-        toggle_grid_action.triggered.connect(self.toggle_grid)
-        view_menu.addAction(toggle_grid_action)
-
-        # Filter menu
-        filter_menu = menubar.addMenu("Filters")
-
-        blur_action = QAction("Blur", self)
-        blur_action.triggered.connect(self.apply_blur_filter)
-        filter_menu.addAction(blur_action)
-
-        sharpen_action = QAction("Sharpen", self)
-        sharpen_action.triggered.connect(self.apply_sharpen_filter)
-        filter_menu.addAction(sharpen_action)
+    def _menu_spec(self):
+        """Menüstruktur als Daten: Eintrag = (Text, Shortcut, Slot[, Optionen]),
+        None als Separator, (Text, Liste) als Untermenü"""
+        return [
+            ("File", [
+                ("New", QKeySequence.StandardKey.New, self.new_file),
+                ("Open", QKeySequence.StandardKey.Open, self.open_file),
+                ("Save", QKeySequence.StandardKey.Save, self.save_file),
+                None,
+                ("Save Project", None, self.save_project),
+                ("Load Project", None, self.load_project),
+                None,
+                ("Export as PNG", None, self.export_png),
+                ("Export as ICO", None, self.export_ico),
+            ]),
+            ("Edit", [
+                ("Undo", QKeySequence.StandardKey.Undo, self.canvas.undo),
+                ("Redo", QKeySequence.StandardKey.Redo, self.canvas.redo),
+                None,
+                ("Transform", [
+                    ("Rotate 90° CW", SHORTCUT_ROTATE_CW, lambda: self.canvas.rotate_layer(90)),
+                    ("Rotate 90° CCW", SHORTCUT_ROTATE_CCW, lambda: self.canvas.rotate_layer(-90)),
+                    ("Rotate 180°", None, lambda: self.canvas.rotate_layer(180)),
+                    None,
+                    ("Flip Horizontal", SHORTCUT_FLIP_H, lambda: self.canvas.flip_layer(True)),
+                    ("Flip Vertical", SHORTCUT_FLIP_V, lambda: self.canvas.flip_layer(False)),
+                ]),
+                None,
+                ("Clear Layer", None, self.canvas.clear_layer),
+                ("Merge Selected Layers", SHORTCUT_MERGE, self.merge_layers),
+                ("Reset All", None, self.canvas.reset_all),
+            ]),
+            ("View", [
+                ("Toggle Grid", None, self.toggle_grid,
+                 {'checkable': True, 'checked': True}),
+            ]),
+            ("Filters", [
+                ("Blur", None, self.apply_blur_filter),
+                ("Sharpen", None, self.apply_sharpen_filter),
+                ("Grayscale", None, self.apply_grayscale_filter),
+                ("Invert", None, self.apply_invert_filter),
+            ]),
+            ("Macros", [
+                ("Macro Manager", None, self.open_macro_manager),
+            ]),
+        ]
 
-        grayscale_action = QAction("Grayscale", self)
-        grayscale_action.triggered.connect(self.apply_grayscale_filter)
-        filter_menu.addAction(grayscale_action)
+    def _populate_menu(self, menu, entries):
+        """Einträge einer Spezifikationsliste in ein QMenu übertragen"""
+        for entry in entries:
+            if entry is None:
+                menu.addSeparator()
+            elif isinstance(entry[1], list):
+                self._populate_menu(menu.addMenu(entry[0]), entry[1])
+            else:
+                label, shortcut, slot = entry[:3]
+                options = entry[3] if len(entry) > 3 else {}
+                action = QAction(label, self)
+                if shortcut is not None:
+                    action.setShortcut(shortcut)
+                if options.get('checkable'):
+                    action.setCheckable(True)
+                    action.setChecked(options.get('checked', False))
+                # Alles läuft im GUI-Thread: DirectConnection spart das
+                # Einreihen eines QMetaCallEvent pro Auslösung
+                action.triggered.connect(slot, Qt.ConnectionType.DirectConnection)
+                menu.addAction(action)
+
+    def _populate_menu_once(self, menu, entries):
+        """aboutToShow-Hook für verzögert befüllte Menüs"""
+        if not menu.actions():
+            self._populate_menu(menu, entries)
 
-        invert_action = QAction("Invert", self)
-        invert_action.triggered.connect(self.apply_invert_filter)
-        filter_menu.addAction(invert_action)
+    def create_menu_bar(self):
+        menubar = self.menuBar()
 
-        # Macro menu
-        macro_menu = menubar.addMenu("Macros")
+        # Filters und Macros tragen keine Shortcuts - ihre Actions werden
+        # erst beim ersten Öffnen des Menüs angelegt. Transform bleibt
+        # eager, weil Ctrl+R & Co. an seinen Actions hängen.
+        deferred = {"Filters", "Macros"}
 
-        macro_manager_action = QAction("Macro Manager", self)
-        macro_manager_action.triggered.connect(self.open_macro_manager)
-        macro_menu.addAction(macro_manager_action)
+        for title, entries in self._menu_spec():
+            menu = menubar.addMenu(title)
+            if title in deferred:
+                menu.aboutToShow.connect(
+                    lambda m=menu, e=entries: self._populate_menu_once(m, e))
+            else:
+                self._populate_menu(menu, entries)
 
     def setup_shortcuts(self):
-        # Tool shortcuts
-        shortcuts = {
+        # Tool keys: ein Dict-Lookup in keyPressEvent statt acht QActions
+        # samt Signal-Registrierungen
+        self._key_to_mode = {
             Qt.Key.Key_P: DrawMode.PENCIL,
             Qt.Key.Key_L: DrawMode.LINE,
             Qt.Key.Key_R: DrawMode.RECTANGLE,
@@ -1872,22 +2569,26 @@ class PixelEditor(QMainWindow):
             Qt.Key.Key_I: DrawMode.PICKER,
             Qt.Key.Key_M: DrawMode.MOVE,
         }
-
-        for key, mode in shortcuts.items():
-            shortcut = QAction(self)
-            shortcut.setShortcut(key)
-            shortcut.triggered.connect(lambda checked, m=mode: self.set_draw_mode(m))
         # Rotate shortcuts
         rotate_cw = QAction(self)
-        rotate_cw.setShortcut("Ctrl+R")
-        rotate_cw.triggered.connect(lambda: self.canvas.rotate_layer(90))
+        rotate_cw.setShortcut(SHORTCUT_ROTATE_CW)
+        rotate_cw.triggered.connect(partial(self.canvas.rotate_layer, 90),
+                                    Qt.ConnectionType.DirectConnection)
         self.addAction(rotate_cw)
 
         rotate_ccw = QAction(self)
-        rotate_ccw.setShortcut("Ctrl+Shift+R")
-        rotate_ccw.triggered.connect(lambda: self.canvas.rotate_layer(-90))
+        rotate_ccw.setShortcut(SHORTCUT_ROTATE_CCW)
+        rotate_ccw.triggered.connect(partial(self.canvas.rotate_layer, -90),
+                                     Qt.ConnectionType.DirectConnection)
         self.addAction(rotate_ccw)
 
+    def keyPressEvent(self, event):
+        mode = self._key_to_mode.get(event.key())
+        if mode is not None and not event.modifiers():
+            self.set_draw_mode(mode)
+            return
+        super().keyPressEvent(event)
+
     def set_draw_mode(self, mode):
         self.canvas.draw_mode = mode
         self.statusBar().showMessage(f"Mode: {mode.value}")
@@ -1897,7 +2598,13 @@ class PixelEditor(QMainWindow):
         self.pen_label.setText(f"{value}px")
 
     def change_grid_size(self, value):
-        self.canvas.resize_grid(value)
+        # Nur den Entprell-Timer neu starten; Zwischenwerte beim Tippen
+        # oder schnellen Scrollen lösen keinen Resize aus
+        self._grid_resize_timer.start()
+
+    def _apply_grid_size(self):
+        self._grid_resize_timer.stop()
+        self.canvas.resize_grid(self.grid_spin.value())
 
     def toggle_grid(self, checked=None):
         if checked is None:
@@ -1936,33 +2643,53 @@ class PixelEditor(QMainWindow):
         self.canvas.merge_selected_layers()
         self.update_layers_list()
 
-    def set_primary_color(self, color):
-        self.canvas.primary_color = color
-
-        # Update alpha label
-        alpha_percent = int((color.alpha() / 255) * 100)
-        self.alpha_label.setText(f"{alpha_percent}%")
+    def _alpha_icon(self, color):
+        """Schachbrett-Icon für transparente Farben, gecacht pro RGBA
 
-        # Update button style to show transparency better
-        if color.alpha() < 255:
-            # Create a pixmap with checkerboard pattern
-            pixmap = QPixmap(48, 48)
-            pixmap.fill(Qt.GlobalColor.transparent)
+        Das Schachbrett wird einmal gezeichnet, pro Farbe kommt nur noch
+        ein fillRect dazu; wiederholte Klicks treffen den Cache.
+        """
+        key = color.rgba()
+        icon = self._alpha_icon_cache.get(key)
+        if icon is not None:
+            return icon
 
-            painter = QPainter(pixmap)
-            # Draw checkerboard
+        if self._checker_bg is None:
+            bg = QPixmap(48, 48)
+            painter = QPainter(bg)
             for i in range(0, 48, 8):
                 for j in range(0, 48, 8):
                     if (i // 8 + j // 8) % 2 == 0:
                         painter.fillRect(i, j, 8, 8, QColor(200, 200, 200))
                     else:
                         painter.fillRect(i, j, 8, 8, QColor(255, 255, 255))
-
-            # Draw color on top
-            painter.fillRect(0, 0, 48, 48, color)
             painter.end()
+            self._checker_bg = bg
+
+        pixmap = QPixmap(self._checker_bg)
+        painter = QPainter(pixmap)
+        painter.fillRect(0, 0, 48, 48, color)
+        painter.end()
 
-            icon = QIcon(pixmap)
+        icon = QIcon(pixmap)
+        if len(self._alpha_icon_cache) >= 64:
+            self._alpha_icon_cache.pop(next(iter(self._alpha_icon_cache)))
+        self._alpha_icon_cache[key] = icon
+        return icon
+
+    def set_primary_color(self, color):
+        if color == self._last_primary:
+            return
+        self._last_primary = QColor(color)
+        self.canvas.set_primary_color(color)
+
+        # Update alpha label
+        alpha_percent = int((color.alpha() / 255) * 100)
+        self.alpha_label.setText(f"{alpha_percent}%")
+
+        # Update button style to show transparency better
+        if color.alpha() < 255:
+            icon = self._alpha_icon(color)
             self.primary_color_btn.setIcon(icon)
             self.primary_color_btn.setIconSize(QSize(48, 48))
             self.primary_color_btn.setStyleSheet("border: 2px solid #888888;")
@@ -1971,41 +2698,79 @@ class PixelEditor(QMainWindow):
             self.statusBar().showMessage(f"Drawing with transparency (Alpha: {alpha_percent}%)")
         else:
             self.primary_color_btn.setIcon(QIcon())  # Remove icon
-            self.primary_color_btn.setStyleSheet(
-                f"background-color: rgba({color.red()}, {color.green()}, {color.blue()}, {color.alpha()}); "
-                f"border: 2px solid #888888;"
-            )
+            self.primary_color_btn.setStyleSheet(self._PRIMARY_CSS.format(
+                color.red(), color.green(), color.blue(), color.alpha()))
             if hasattr(self, 'statusBar'):
                 self.statusBar().showMessage("Ready")
 
     def set_secondary_color(self, color):
-        self.canvas.secondary_color = color
-        self.secondary_color_btn.setStyleSheet(
-            f"background-color: rgba({color.red()}, {color.green()}, {color.blue()}, {color.alpha()})")
+        if color == self._last_secondary:
+            return
+        self._last_secondary = QColor(color)
+        self.canvas.set_secondary_color(color)
+        self.secondary_color_btn.setStyleSheet(self._SECONDARY_CSS.format(
+            color.red(), color.green(), color.blue(), color.alpha()))
+
+    @staticmethod
+    def _layer_item_text(layer):
+        """Anzeigetext einer Layer-Zeile (Auswahl, Sichtbarkeit, Opacity)"""
+        visibility = '👁' if layer.visible else '🚫'
+        selection = '☑' if layer.selected else '☐'
+        opacity = f" ({int(layer.opacity * 100)}%)" if layer.opacity < 1.0 else ""
+        return f"{selection} {visibility} {layer.name}{opacity}"
+
+    def _refresh_layer_row(self, row):
+        """Nur den Text einer einzelnen Zeile nachziehen (Icon bleibt)"""
+        item = self.layers_list.item(row)
+        if item is not None:
+            text = self._layer_item_text(self.canvas.layers[row])
+            if item.text() != text:
+                item.setText(text)
 
     def update_layers_list(self):
-        self.layers_list.clear()
-        for i, layer in enumerate(self.canvas.layers):
-            visibility = '👁' if layer.visible else '🚫'
-            selection = '☑' if layer.selected else '☐'
-            opacity = f" ({int(layer.opacity * 100)}%)" if layer.opacity < 1.0 else ""
-            item = QListWidgetItem(f"{selection} {visibility} {layer.name}{opacity}")
-            self.layers_list.addItem(item)
-
-        self.layers_list.setCurrentRow(self.canvas.current_layer)
+        offset = self.canvas.get_virtual_offset()
+        source = QRect(offset, offset, self.canvas.grid_size, self.canvas.grid_size)
+        layers = self.canvas.layers
+        lst = self.layers_list
+
+        # Diff statt clear()+Neuaufbau: Zeilenzahl angleichen, dann nur
+        # tatsächlich geänderte Texte/Icons anfassen - ein Opacity-Tick
+        # ändert so genau eine Zeile statt das Model zurückzusetzen
+        lst.setUpdatesEnabled(False)
+        while lst.count() > len(layers):
+            lst.takeItem(lst.count() - 1)
+        while lst.count() < len(layers):
+            lst.addItem(QListWidgetItem())
+
+        for i, layer in enumerate(layers):
+            item = lst.item(i)
+            text = self._layer_item_text(layer)
+            if item.text() != text:
+                item.setText(text)
+            icon_key = (id(layer), layer.epoch, offset, self.canvas.grid_size)
+            if item.data(Qt.ItemDataRole.UserRole) != icon_key:
+                item.setIcon(QIcon(layer.thumbnail(source)))
+                item.setData(Qt.ItemDataRole.UserRole, icon_key)
+        lst.setUpdatesEnabled(True)
+
+        if lst.currentRow() != self.canvas.current_layer:
+            lst.setCurrentRow(self.canvas.current_layer)
 
     def select_layer(self, item):
         row = self.layers_list.row(item)
 
         # Check if Ctrl/Cmd is pressed for multi-selection
         if QApplication.keyboardModifiers() & Qt.KeyboardModifier.ControlModifier:
-            # Toggle selection
+            # Toggle selection - nur die angeklickte Zeile neu schreiben
             self.canvas.layers[row].selected = not self.canvas.layers[row].selected
-            self.update_layers_list()
+            self._refresh_layer_row(row)
         else:
-            # Normal selection - clear others
-            for layer in self.canvas.layers:
-                layer.selected = False
+            # Normal selection - nur tatsächlich markierte Zeilen anfassen
+            # statt alle Zeilen neu aufzubauen
+            for i, layer in enumerate(self.canvas.layers):
+                if layer.selected:
+                    layer.selected = False
+                    self._refresh_layer_row(i)
             self.canvas.current_layer = row
 
             # Update opacity slider
@@ -2030,46 +2795,77 @@ class PixelEditor(QMainWindow):
             self.canvas.remove_layer(current)
             self.update_layers_list()
 
+    def _flush_canvas_update(self):
+        """Gesammelte Slider-Änderungen einmal pro Frame darstellen"""
+        self.canvas.update()
+        self.update_layers_list()
+
     def change_layer_opacity(self, value):
         opacity = value / 100.0
         self.opacity_label.setText(f"{value}%")
         if 0 <= self.canvas.current_layer < len(self.canvas.layers):
             self.canvas.layers[self.canvas.current_layer].opacity = opacity
-            self.canvas.update()
-            self.update_layers_list()
+            self.canvas.invalidate_composite()
+            # Coalesce repaint + list refresh to one shot per frame
+            self._canvas_update_timer.start()
 
     def new_file(self):
         self.canvas.reset_all()
         self.update_layers_list()
 
+    def _pick_file(self, caption, name_filter, save=False):
+        """Gemeinsamer Dateidialog aller Open/Save/Export-Aktionen
+
+        Ein einziges, nicht-natives QFileDialog wird lazy angelegt und
+        pro Aufruf nur umkonfiguriert, statt dass jeder Klick über die
+        statischen get*FileName-Helfer einen frischen Dialog aufbaut.
+        Nebeneffekt: das zuletzt besuchte Verzeichnis bleibt erhalten.
+        """
+        if self._file_dialog is None:
+            self._file_dialog = QFileDialog(self)
+            self._file_dialog.setOption(
+                QFileDialog.Option.DontUseNativeDialog, True)
+        dialog = self._file_dialog
+        dialog.setWindowTitle(caption)
+        dialog.setNameFilter(name_filter)
+        if save:
+            dialog.setAcceptMode(QFileDialog.AcceptMode.AcceptSave)
+            dialog.setFileMode(QFileDialog.FileMode.AnyFile)
+        else:
+            dialog.setAcceptMode(QFileDialog.AcceptMode.AcceptOpen)
+            dialog.setFileMode(QFileDialog.FileMode.ExistingFile)
+        if dialog.exec():
+            return dialog.selectedFiles()[0]
+        return None
+
     def open_file(self):
-        filename, _ = QFileDialog.getOpenFileName(
-            self, "Open Image", "",
+        filename = self._pick_file(
+            "Open Image",
             "Image Files (*.png *.jpg *.jpeg *.bmp *.gif);;All Files (*)"
         )
         if filename:
             self.canvas.load_image(filename)
 
     def save_file(self):
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Save Image", "",
-            "PNG Files (*.png);;All Files (*)"
+        filename = self._pick_file(
+            "Save Image", "PNG Files (*.png);;All Files (*)", save=True
         )
         if filename:
             pixmap = self.canvas.export_image()
             pixmap.save(filename)
 
     def save_project(self):
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Save Project", "",
-            "Pixel Editor Project (*.pep);;JSON Files (*.json);;All Files (*)"
+        filename = self._pick_file(
+            "Save Project",
+            "Pixel Editor Project (*.pep);;JSON Files (*.json);;All Files (*)",
+            save=True
         )
         if filename:
             self.canvas.save_project(filename)
 
     def load_project(self):
-        filename, _ = QFileDialog.getOpenFileName(
-            self, "Load Project", "",
+        filename = self._pick_file(
+            "Load Project",
             "Pixel Editor Project (*.pep);;JSON Files (*.json);;All Files (*)"
         )
         if filename:
@@ -2078,9 +2874,8 @@ class PixelEditor(QMainWindow):
             self.grid_spin.setValue(self.canvas.grid_size)
 
     def export_png(self):
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Export as PNG", "",
-            "PNG Files (*.png);;All Files (*)"
+        filename = self._pick_file(
+            "Export as PNG", "PNG Files (*.png);;All Files (*)", save=True
         )
         if filename:
             # Check if user wants to include transparency
@@ -2104,56 +2899,74 @@ class PixelEditor(QMainWindow):
             if ok:
                 pixmap = self.canvas.export_image()
 
-                # If no transparency wanted, composite on white background
-                if result == QMessageBox.StandardButton.No:
-                    white_bg = QPixmap(pixmap.size())
-                    white_bg.fill(Qt.GlobalColor.white)
-                    painter = QPainter(white_bg)
-                    painter.drawPixmap(0, 0, pixmap)
-                    painter.end()
-                    pixmap = white_bg
-
                 scaled = pixmap.scaled(
                     size, size,
                     Qt.AspectRatioMode.KeepAspectRatio,
                     Qt.TransformationMode.SmoothTransformation
                 )
+
+                # If no transparency wanted, composite on white background.
+                # Scale first, then composite: the white pass touches only
+                # the (usually smaller) export buffer statt des Canvas.
+                if result == QMessageBox.StandardButton.No:
+                    white_bg = QPixmap(scaled.size())
+                    white_bg.fill(Qt.GlobalColor.white)
+                    painter = QPainter(white_bg)
+                    painter.drawPixmap(0, 0, scaled)
+                    painter.end()
+                    scaled = white_bg
+
                 scaled.save(filename)
 
     def export_ico(self):
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Export as ICO", "",
-            "ICO Files (*.ico);;All Files (*)"
+        filename = self._pick_file(
+            "Export as ICO", "ICO Files (*.ico);;All Files (*)", save=True
         )
         if filename:
-            pixmap = self.canvas.export_image()
-            # Create multiple sizes for ICO
+            # Einmal nach QImage wandeln; sonst konvertiert jeder der
+            # sechs PNG-Encodes das Pixmap erneut
+            image = self.canvas.export_image().toImage()
+            # Alle Größen landen als PNG-Einträge in einem echten
+            # Multi-Resolution-ICO (Qt selbst kann nur Einzelbilder)
             sizes = [16, 32, 48, 64, 128, 256]
-            images = []
+            entries = []
             for size in sizes:
-                scaled = pixmap.scaled(
+                scaled = image.scaled(
                     size, size,
                     Qt.AspectRatioMode.KeepAspectRatio,
                     Qt.TransformationMode.SmoothTransformation
                 )
-                images.append(scaled)
-            # Save as ICO (simplified - in production use proper ICO library)
-            images[1].save(filename)  # Save 32x32 as default
+                buffer = QBuffer()
+                buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+                scaled.save(buffer, "PNG")
+                entries.append((scaled.width(), scaled.height(),
+                                bytes(buffer.data())))
+
+            with open(filename, 'wb') as f:
+                # ICONDIR: reserved, type 1 (icon), entry count
+                f.write(struct.pack('<HHH', 0, 1, len(entries)))
+                offset = 6 + 16 * len(entries)
+                for width, height, blob in entries:
+                    # ICONDIRENTRY; width/height 0 steht für 256
+                    f.write(struct.pack(
+                        '<BBBBHHII',
+                        width % 256, height % 256, 0, 0, 1, 32,
+                        len(blob), offset))
+                    offset += len(blob)
+                for _, _, blob in entries:
+                    f.write(blob)
 
     def load_palette(self):
-        filename, _ = QFileDialog.getOpenFileName(
-            self, "Load Palette", "",
-            "JSON Files (*.json);;All Files (*)"
+        filename = self._pick_file(
+            "Load Palette", "JSON Files (*.json);;All Files (*)"
         )
         if filename:
-            with open(filename, 'r') as f:
-                colors = json.load(f)
-                self.palette.import_palette(colors)
+            colors = _load_palette_file(filename, os.path.getmtime(filename))
+            self.palette.import_palette(colors)
 
     def save_palette(self):
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Save Palette", "",
-            "JSON Files (*.json);;All Files (*)"
+        filename = self._pick_file(
+            "Save Palette", "JSON Files (*.json);;All Files (*)", save=True
         )
         if filename:
             colors = self.palette.export_palette()
@@ -2161,82 +2974,102 @@ class PixelEditor(QMainWindow):
                 json.dump(colors, f, indent=2)
 
     def open_macro_manager(self):
-        dialog = MacroDialog(self)
-        dialog.exec()
-
-    def apply_blur_filter(self):
-        # Simplified blur filter
-        self.canvas.save_state()
+        if self._macro_dialog is None:
+            self._macro_dialog = MacroDialog(self)
+        self._macro_dialog.exec()
+
+    def _apply_filter(self, fn):
+        """Gemeinsames Gerüst aller Filter: Undo-Stand sichern, fn auf den
+        belegten uint32-Ausschnitt des aktiven Layers loslassen (in-place),
+        Caches invalidieren und neu zeichnen
+
+        Ein leerer Layer wird ohne Undo-Eintrag übersprungen; sonst läuft
+        der Filter nur über die Content-Bounding-Box plus 2 Pixel Rand
+        (genug für den 1-Pixel-Auslauf der 3x3-Kernel), nicht über das
+        ganze Raster. Gibt zurück, ob gefiltert wurde.
+        """
         current_layer = self.canvas.layers[self.canvas.current_layer]
-        offset = self.canvas.get_virtual_offset()
+        bbox = current_layer.content_bbox()
+        if bbox is None:
+            return False
 
-        # Extract visible area
-        visible_area = current_layer.pixmap.copy(offset, offset, self.canvas.grid_size, self.canvas.grid_size)
-        image = visible_area.toImage()
-
-        # Apply simple box blur
-        for y in range(1, self.canvas.grid_size - 1):
-            for x in range(1, self.canvas.grid_size - 1):
-                r, g, b, a = 0, 0, 0, 0
-                count = 0
-                for dy in [-1, 0, 1]:
-                    for dx in [-1, 0, 1]:
-                        pixel = image.pixelColor(x + dx, y + dy)
-                        r += pixel.red()
-                        g += pixel.green()
-                        b += pixel.blue()
-                        a += pixel.alpha()
-                        count += 1
-                color = QColor(r // count, g // count, b // count, a // count)
-                image.setPixelColor(x, y, color)
-
-        # Put back into virtual canvas
-        painter = QPainter(current_layer.pixmap)
-        painter.drawImage(offset, offset, image)
-        painter.end()
-        self.canvas.update()
+        offset = self.canvas.get_virtual_offset()
+        grid = self.canvas.grid_size
+        x0 = max(bbox.left() - 2, offset)
+        y0 = max(bbox.top() - 2, offset)
+        x1 = min(bbox.right() + 3, offset + grid)
+        y1 = min(bbox.bottom() + 3, offset + grid)
+        if x0 >= x1 or y0 >= y1:
+            return False
 
-    def apply_sharpen_filter(self):
-        # Simplified sharpen filter
         self.canvas.save_state()
-        self.statusBar().showMessage("Sharpen filter applied")
+        fn(current_layer.data[y0:y1, x0:x1])
 
-    def apply_grayscale_filter(self):
-        self.canvas.save_state()
-        current_layer = self.canvas.layers[self.canvas.current_layer]
-        offset = self.canvas.get_virtual_offset()
-
-        # Extract visible area
-        visible_area = current_layer.pixmap.copy(offset, offset, self.canvas.grid_size, self.canvas.grid_size)
-        image = visible_area.toImage()
+        current_layer.mark_dirty()
+        self.canvas.invalidate_composite()
+        self.canvas.update()
+        return True
 
-        for y in range(self.canvas.grid_size):
-            for x in range(self.canvas.grid_size):
-                pixel = image.pixelColor(x, y)
-                gray = int(0.299 * pixel.red() + 0.587 * pixel.green() + 0.114 * pixel.blue())
-                image.setPixelColor(x, y, QColor(gray, gray, gray, pixel.alpha()))
+    def apply_blur_filter(self):
+        def blur(view):
+            # Box blur runs as a kernel on the uint32 buffer instead of
+            # pixelColor/setPixelColor per pixel
+            blurred = view.copy()
+            pixel_ops.box_blur(view, blurred)
+            view[:] = blurred
 
-        # Put back into virtual canvas
-        painter = QPainter(current_layer.pixmap)
-        painter.drawImage(offset, offset, image)
-        painter.end()
-        self.canvas.update()
+        self._apply_filter(blur)
 
-    def apply_invert_filter(self):
-        self.canvas.save_state()
-        current_layer = self.canvas.layers[self.canvas.current_layer]
-        offset = self.canvas.get_virtual_offset()
+    def apply_sharpen_filter(self):
+        def sharpen(view):
+            # 3x3-Schärfungskern (5 in der Mitte, -1 im Kreuz) als reine
+            # Integer-Arithmetik auf dem uint32-Puffer; die Ränder bleiben
+            # unverändert. Jeder Kanal wird auf [0, alpha] geklemmt, damit
+            # der Puffer premultipliziert gültig bleibt.
+            src = view.astype(np.int32)
+            a = (src >> 24) & 0xFF
+            a_core = a[1:-1, 1:-1]
+
+            sharpened = []
+            for shift in (16, 8, 0):
+                ch = (src >> shift) & 0xFF
+                acc = (5 * ch[1:-1, 1:-1]
+                       - ch[:-2, 1:-1] - ch[2:, 1:-1]
+                       - ch[1:-1, :-2] - ch[1:-1, 2:])
+                sharpened.append(np.clip(acc, 0, a_core))
+
+            r, g, b = sharpened
+            view[1:-1, 1:-1] = ((a_core << 24) | (r << 16) | (g << 8) | b
+                                ).astype(np.uint32)
+
+        if self._apply_filter(sharpen):
+            self.statusBar().showMessage("Sharpen filter applied")
 
-        # Extract visible area
-        visible_area = current_layer.pixmap.copy(offset, offset, self.canvas.grid_size, self.canvas.grid_size)
-        image = visible_area.toImage()
-        image.invertPixels()
+    def apply_grayscale_filter(self):
+        def grayscale(view):
+            # Luminanz als Festkomma-Gewichte (77+150+29 = 256) - ein
+            # vektorisierter Durchlauf. Auf premultiplizierten Kanälen
+            # bleibt das Ergebnis premultipliziert, Alpha ist unberührt.
+            r = (view >> 16) & 0xFF
+            g = (view >> 8) & 0xFF
+            b = view & 0xFF
+            gray = (r * 77 + g * 150 + b * 29) >> 8
+            view[:] = (view & 0xFF000000) | (gray << 16) | (gray << 8) | gray
+
+        self._apply_filter(grayscale)
 
-        # Put back into virtual canvas
-        painter = QPainter(current_layer.pixmap)
-        painter.drawImage(offset, offset, image)
-        painter.end()
-        self.canvas.update()
+    def apply_invert_filter(self):
+        def invert(view):
+            # Premultiplied invert of a channel c is a - c (the real-valued
+            # un-premultiply/invert/re-premultiply collapses to that), so
+            # the whole filter is three subtractions; alpha stays untouched.
+            a = (view >> 24) & 0xFF
+            r = a - ((view >> 16) & 0xFF)
+            g = a - ((view >> 8) & 0xFF)
+            b = a - (view & 0xFF)
+            view[:] = (a << 24) | (r << 16) | (g << 8) | b
+
+        self._apply_filter(invert)
 
     def save_settings(self):
         """Save app settings"""
@@ -2256,9 +3089,19 @@ class PixelEditor(QMainWindow):
             }
         }
 
+        # Unverändert? Dann gar nicht erst schreiben
+        payload = json.dumps(settings, sort_keys=True, separators=(',', ':'))
+        if payload == self._last_settings_payload:
+            return
+
         try:
-            with open(SETTINGS_FILE, 'w') as f:
-                json.dump(settings, f, indent=2)
+            # Atomar über eine Temp-Datei: ein Absturz mitten im Schreiben
+            # lässt die alte Datei intakt
+            tmp = SETTINGS_FILE + '.tmp'
+            with open(tmp, 'w') as f:
+                f.write(payload)
+            os.replace(tmp, SETTINGS_FILE)
+            self._last_settings_payload = payload
         except:
             pass  # Fail silently
 
@@ -2267,45 +3110,77 @@ class PixelEditor(QMainWindow):
         try:
             with open(SETTINGS_FILE, 'r') as f:
                 settings = json.load(f)
+        except FileNotFoundError:
+            return  # Erster Start - Defaults behalten
+        except (OSError, json.JSONDecodeError) as e:
+            # Kaputte Datei beiseitelegen statt sie beim Beenden stumm
+            # zu überschreiben
+            print(f"Settings unlesbar ({e}), Datei wird umbenannt", file=sys.stderr)
+            try:
+                os.replace(SETTINGS_FILE, SETTINGS_FILE + '.broken')
+            except OSError:
+                pass
+            return
 
-            # Apply settings
-            if 'grid_size' in settings:
-                self.canvas.grid_size = settings['grid_size']
-                self.canvas.virtual_size = settings['grid_size'] * 3
-                self.canvas.update_size()
+        self._last_settings_payload = json.dumps(
+            settings, sort_keys=True, separators=(',', ':'))
+
+        # Apply settings. Die Widget-Setter laufen mit blockierten
+        # Signalen: der Canvas-Zustand wird hier direkt gesetzt, die
+        # Slot-Kaskaden (resize/update/Listen-Refresh) wären redundant.
+        if 'grid_size' in settings:
+            # Über resize_grid gehen: das baut auch die Ebenenpuffer und
+            # den virtuellen Offset um. grid_size direkt zu setzen ließe
+            # die Start-Puffer in alter Größe zurück - und der No-op-Guard
+            # in resize_grid würde das anschließend nie mehr korrigieren.
+            self.canvas.resize_grid(settings['grid_size'])
+            with QSignalBlocker(self.grid_spin):
                 self.grid_spin.setValue(settings['grid_size'])
 
-            if 'show_grid' in settings:
-                self.canvas.show_grid = settings['show_grid']
+        if 'show_grid' in settings:
+            self.canvas.show_grid = settings['show_grid']
+            with QSignalBlocker(self.grid_checkbox):
                 self.grid_checkbox.setChecked(settings['show_grid'])
 
-            if 'blur_mode' in settings:
-                self.canvas.blur_mode = settings['blur_mode']
+        if 'blur_mode' in settings:
+            self.canvas.blur_mode = settings['blur_mode']
+            with QSignalBlocker(self.blur_checkbox):
                 self.blur_checkbox.setChecked(settings['blur_mode'])
 
-            if 'pen_width' in settings:
-                self.canvas.pen_width = settings['pen_width']
+        if 'pen_width' in settings:
+            self.canvas.pen_width = settings['pen_width']
+            with QSignalBlocker(self.pen_slider):
                 self.pen_slider.setValue(settings['pen_width'])
+            self.pen_label.setText(f"{settings['pen_width']}px")
 
-            if 'primary_color' in settings:
-                self.set_primary_color(QColor(settings['primary_color']))
+        if 'primary_color' in settings:
+            self.set_primary_color(QColor(settings['primary_color']))
 
-            if 'secondary_color' in settings:
-                self.set_secondary_color(QColor(settings['secondary_color']))
+        if 'secondary_color' in settings:
+            self.set_secondary_color(QColor(settings['secondary_color']))
 
-            if 'palette' in settings:
-                self.palette.import_palette(settings['palette'])
+        if 'palette' in settings:
+            self.palette.import_palette(settings['palette'])
 
-            if 'window_geometry' in settings:
-                geo = settings['window_geometry']
+        if 'window_geometry' in settings:
+            geo = settings['window_geometry']
+            try:
                 self.setGeometry(geo['x'], geo['y'], geo['width'], geo['height'])
-
-        except:
-            pass  # Use defaults if no settings file
+            except (KeyError, TypeError) as e:
+                print(f"Fenstergeometrie übersprungen ({e})", file=sys.stderr)
 
     def preview_rotation(self, angle):
-        """Preview rotation in real-time"""
-        # Store the angle for preview
+        """Preview rotation in real-time (coalesced per frame)"""
+        # Only remember the angle here - the single-shot timer renders
+        # once per frame, so dragging through 360 ticks does not trigger
+        # 360 full resamples
+        self._pending_rotation_angle = angle
+        if not self._rotation_preview_timer.isActive():
+            self._rotation_preview_timer.start()
+
+    def _do_preview_rotation(self):
+        """Den zuletzt gemeldeten Slider-Winkel tatsächlich rendern"""
+        angle = self._pending_rotation_angle
         self.rotation_preview_angle = angle
         self.canvas.rotation_preview_angle = angle
         self.canvas.rotation_preview_active = True
@@ -2330,6 +3205,9 @@ class PixelEditor(QMainWindow):
 
     def apply_rotation(self):
         """Apply the rotation when slider is released"""
+        # Cancel a still-pending preview tick so it cannot re-activate
+        # the preview after the rotation has been applied
+        self._rotation_preview_timer.stop()
         angle = self.rotation_slider.value()
 
         # Snap to 45° increments if Shift is pressed
@@ -2361,6 +3239,7 @@ class PixelEditor(QMainWindow):
 
     def reset_rotation(self):
         """Reset rotation slider and cancel preview"""
+        self._rotation_preview_timer.stop()
         self.rotation_slider.setValue(0)
         self.rotation_label.setText("0°")
         self.canvas.rotation_preview_angle = 0
@@ -2382,12 +3261,12 @@ class PixelEditor(QMainWindow):
 
 
 def main():
+    # Fusion vor der QApplication setzen: so wird kein bereits erzeugter
+    # Widget-Baum beim Stilwechsel neu poliert, und Fusion zeichnet die
+    # flache Oberfläche auf allen Plattformen günstiger als der native Stil
+    QApplication.setStyle(QStyleFactory.create("Fusion"))
     app = QApplication(sys.argv)
 
-    # macOS specific settings
-    if sys.platform == "darwin":
-        app.setStyle("Fusion")
-
     editor = PixelEditor()
     editor.show()
 
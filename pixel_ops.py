@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Raster-Kernel für uint32-ARGB-Pixelpuffer (NumPy-Views auf QImage-Bits)
+
+Die Kernel laufen komplett ausserhalb von QPainter, damit pixelgenaue
+Werkzeuge nicht pro gezeichnetem Punkt die Python↔Qt-Grenze überqueren.
+Ist Numba installiert, werden sie JIT-kompiliert; ohne Numba laufen die
+gleichen Funktionen als reine Python-Schleifen (immer noch ein Aufruf
+pro Primitive statt pro Pixel).
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return wrap
+
+
+@njit(cache=True)
+def bresenham(arr, x0, y0, x1, y1, color):
+    """Bresenham-Linie direkt in den uint32-Puffer schreiben"""
+    height, width = arr.shape
+    dx = abs(x1 - x0)
+    dy = abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx - dy
+
+    while True:
+        if 0 <= x0 < width and 0 <= y0 < height:
+            arr[y0, x0] = color
+
+        if x0 == x1 and y0 == y1:
+            break
+
+        e2 = 2 * err
+        if e2 > -dy:
+            err -= dy
+            x0 += sx
+        if e2 < dx:
+            err += dx
+            y0 += sy
+
+
+def _bresenham_np(arr, x0, y0, x1, y1, color):
+    """Vektorisierte Linie für den Betrieb ohne Numba
+
+    Rastert alle Punkte in einem NumPy-Durchlauf (DDA mit Bresenham-
+    Rundung) statt einer Python-Schleife pro Pixel.
+    """
+    height, width = arr.shape
+    steps = max(abs(x1 - x0), abs(y1 - y0)) + 1
+    xs = np.floor(np.linspace(x0, x1, steps) + 0.5).astype(np.intp)
+    ys = np.floor(np.linspace(y0, y1, steps) + 0.5).astype(np.intp)
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    arr[ys[inside], xs[inside]] = color
+
+
+if not _HAVE_NUMBA:
+    bresenham = _bresenham_np
+
+
+@njit(cache=True)
+def bresenham_blend(arr, x0, y0, x1, y1, color):
+    """Bresenham-Linie mit Source-Over-Blending in den uint32-Puffer
+
+    Für halbtransparente 1-Pixel-Striche: gleiche Rasterung wie
+    bresenham, aber jeder Punkt wird premultipliziert über den
+    Untergrund gelegt statt ihn zu überschreiben.
+    """
+    height, width = arr.shape
+    sa = (color >> 24) & 0xFF
+    sr = (color >> 16) & 0xFF
+    sg = (color >> 8) & 0xFF
+    sb = color & 0xFF
+    inv = 255 - sa
+
+    dx = abs(x1 - x0)
+    dy = abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx - dy
+
+    while True:
+        if 0 <= x0 < width and 0 <= y0 < height:
+            d = arr[y0, x0]
+            a = sa + ((d >> 24) & 0xFF) * inv // 255
+            r = sr + ((d >> 16) & 0xFF) * inv // 255
+            g = sg + ((d >> 8) & 0xFF) * inv // 255
+            b = sb + (d & 0xFF) * inv // 255
+            arr[y0, x0] = (a << 24) | (r << 16) | (g << 8) | b
+
+        if x0 == x1 and y0 == y1:
+            break
+
+        e2 = 2 * err
+        if e2 > -dy:
+            err -= dy
+            x0 += sx
+        if e2 < dx:
+            err += dx
+            y0 += sy
+
+
+def _bresenham_blend_np(arr, x0, y0, x1, y1, color):
+    """Vektorisierte Blend-Linie für den Betrieb ohne Numba
+
+    Linienpunkte wie in _bresenham_np, das Source-Over-Blending läuft
+    als ein Array-Durchlauf über alle getroffenen Pixel.
+    """
+    height, width = arr.shape
+    steps = max(abs(x1 - x0), abs(y1 - y0)) + 1
+    xs = np.floor(np.linspace(x0, x1, steps) + 0.5).astype(np.intp)
+    ys = np.floor(np.linspace(y0, y1, steps) + 0.5).astype(np.intp)
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    xs = xs[inside]
+    ys = ys[inside]
+
+    color = int(color)
+    inv = 255 - ((color >> 24) & 0xFF)
+    d = arr[ys, xs]
+    a = ((color >> 24) & 0xFF) + ((d >> 24) & 0xFF) * inv // 255
+    r = ((color >> 16) & 0xFF) + ((d >> 16) & 0xFF) * inv // 255
+    g = ((color >> 8) & 0xFF) + ((d >> 8) & 0xFF) * inv // 255
+    b = (color & 0xFF) + (d & 0xFF) * inv // 255
+    arr[ys, xs] = (a << 24) | (r << 16) | (g << 8) | b
+
+
+if not _HAVE_NUMBA:
+    bresenham_blend = _bresenham_blend_np
+
+
+@njit(cache=True)
+def bresenham_thick(arr, x0, y0, x1, y1, color, radius):
+    """Bresenham-Linie mit rundem Pinsel direkt in den uint32-Puffer
+
+    Stempelt an jedem Linienpunkt eine Kreisscheibe mit dem gegebenen
+    Radius - ersetzt den QPainter-Pfad für breite, deckende Stifte.
+    """
+    height, width = arr.shape
+    dx = abs(x1 - x0)
+    dy = abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx - dy
+    r2 = radius * radius
+
+    while True:
+        for oy in range(-radius, radius + 1):
+            for ox in range(-radius, radius + 1):
+                if ox * ox + oy * oy <= r2:
+                    px = x0 + ox
+                    py = y0 + oy
+                    if 0 <= px < width and 0 <= py < height:
+                        arr[py, px] = color
+
+        if x0 == x1 and y0 == y1:
+            break
+
+        e2 = 2 * err
+        if e2 > -dy:
+            err -= dy
+            x0 += sx
+        if e2 < dx:
+            err += dx
+            y0 += sy
+
+
+def _bresenham_thick_np(arr, x0, y0, x1, y1, color, radius):
+    """Vektorisierte breite Linie für den Betrieb ohne Numba
+
+    Linienpunkte wie in _bresenham_np, die Kreisscheibe wird per
+    Broadcasting auf alle Punkte gleichzeitig gestempelt.
+    """
+    height, width = arr.shape
+    steps = max(abs(x1 - x0), abs(y1 - y0)) + 1
+    xs = np.floor(np.linspace(x0, x1, steps) + 0.5).astype(np.intp)
+    ys = np.floor(np.linspace(y0, y1, steps) + 0.5).astype(np.intp)
+
+    oy, ox = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    disk = (ox * ox + oy * oy) <= radius * radius
+    ox = ox[disk]
+    oy = oy[disk]
+
+    px = (xs[:, None] + ox[None, :]).ravel()
+    py = (ys[:, None] + oy[None, :]).ravel()
+    inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    arr[py[inside], px[inside]] = color
+
+
+if not _HAVE_NUMBA:
+    bresenham_thick = _bresenham_thick_np
+
+
+@njit(cache=True)
+def flood_fill(arr, x, y, target, replacement):
+    """Flood-Fill mit explizitem Stack direkt im uint32-Puffer
+
+    Scanline-Variante (Heckbert): pro Stack-Eintrag wird eine ganze
+    horizontale Spanne gefüllt, nicht ein einzelner Pixel.
+    """
+    height, width = arr.shape
+    # Explicit stack instead of recursion. Worst case: a pixel can be
+    # seeded from the row above AND the row below while still unfilled
+    # (comb/stripe patterns), so up to two pending seeds per pixel.
+    stack = np.empty((2 * arr.size, 2), dtype=np.int64)
+    top = 0
+    stack[top, 0] = x
+    stack[top, 1] = y
+    top += 1
+
+    while top > 0:
+        top -= 1
+        x = stack[top, 0]
+        y = stack[top, 1]
+        if arr[y, x] != target:
+            continue
+
+        # Extend the span left and right of the seed
+        x0 = x
+        while x0 > 0 and arr[y, x0 - 1] == target:
+            x0 -= 1
+        x1 = x + 1
+        while x1 < width and arr[y, x1] == target:
+            x1 += 1
+
+        arr[y, x0:x1] = replacement
+
+        # Seed the start of every fillable run in the rows above and below
+        for ny in (y - 1, y + 1):
+            if not 0 <= ny < height:
+                continue
+            in_run = False
+            for nx in range(x0, x1):
+                if arr[ny, nx] == target:
+                    if not in_run:
+                        stack[top, 0] = nx
+                        stack[top, 1] = ny
+                        top += 1
+                        in_run = True
+                else:
+                    in_run = False
+
+
+def _flood_fill_np(arr, x, y, target, replacement):
+    """Vektorisierter Scanline-Fill für den Betrieb ohne Numba
+
+    Gleiche Scanline-Strategie, aber Spannen- und Saatpunktsuche laufen
+    als NumPy-Operationen über die ganze Zeile statt pixelweise.
+    """
+    height, width = arr.shape
+    stack = [(x, y)]
+    while stack:
+        x, y = stack.pop()
+        row = arr[y]
+        if row[x] != target:
+            continue
+
+        blocked = np.flatnonzero(row[:x] != target)
+        x0 = int(blocked[-1]) + 1 if blocked.size else 0
+        blocked = np.flatnonzero(row[x:] != target)
+        x1 = x + int(blocked[0]) if blocked.size else width
+
+        row[x0:x1] = replacement
+
+        for ny in (y - 1, y + 1):
+            if not 0 <= ny < height:
+                continue
+            fillable = arr[ny, x0:x1] == target
+            starts = np.flatnonzero(fillable & ~np.roll(fillable, 1))
+            if fillable[0]:
+                starts = np.union1d(starts, [0])
+            for sx in starts:
+                stack.append((x0 + int(sx), ny))
+
+
+@njit(cache=True, parallel=True)
+def box_blur(src, dst):
+    """3x3-Box-Blur auf premultipliziertem ARGB (uint32)
+
+    Liest aus src, schreibt das Innere von dst; die Ränder bleiben
+    unverändert. SWAR: jeder Pixel wird in vier 16-Bit-Felder eines
+    uint64 gespreizt (9 * 255 passt in 16 Bit), die Fenstersumme ist
+    dann eine uint64-Addition pro Nachbar statt vier Byte-Additionen.
+    """
+    height, width = src.shape
+    spread = np.empty((height, width), np.uint64)
+    for y in prange(height):
+        for x in range(width):
+            v = np.uint64(src[y, x])
+            spread[y, x] = ((v & np.uint64(0xFF))
+                            | ((v & np.uint64(0xFF00)) << np.uint64(8))
+                            | ((v & np.uint64(0xFF0000)) << np.uint64(16))
+                            | ((v & np.uint64(0xFF000000)) << np.uint64(24)))
+
+    mask = np.uint64(0xFFFF)
+    for y in prange(1, height - 1):
+        for x in range(1, width - 1):
+            acc = np.uint64(0)
+            for dy in range(-1, 2):
+                for dx in range(-1, 2):
+                    acc += spread[y + dy, x + dx]
+            a = ((acc >> np.uint64(48)) & mask) // 9
+            r = ((acc >> np.uint64(32)) & mask) // 9
+            g = ((acc >> np.uint64(16)) & mask) // 9
+            b = (acc & mask) // 9
+            dst[y, x] = np.uint32((a << 24) | (r << 16) | (g << 8) | b)
+
+
+def _box_blur_np(src, dst):
+    """Vektorisierter 3x3-Box-Blur für den Betrieb ohne Numba
+
+    Gleicher SWAR-Trick wie im Numba-Kernel, nur als Array-Operationen:
+    ein uint64-Summenbild statt vier uint16-Kanalebenen.
+    """
+    v = src.astype(np.uint64)
+    spread = ((v & 0xFF) | ((v & 0xFF00) << 8)
+              | ((v & 0xFF0000) << 16) | ((v & 0xFF000000) << 24))
+    acc = np.zeros((src.shape[0] - 2, src.shape[1] - 2), dtype=np.uint64)
+    for dy in range(3):
+        for dx in range(3):
+            acc += spread[dy:src.shape[0] - 2 + dy, dx:src.shape[1] - 2 + dx]
+    a = ((acc >> 48) & 0xFFFF) // 9
+    r = ((acc >> 32) & 0xFFFF) // 9
+    g = ((acc >> 16) & 0xFFFF) // 9
+    b = (acc & 0xFFFF) // 9
+    dst[1:-1, 1:-1] = ((a << 24) | (r << 16) | (g << 8) | b).astype(np.uint32)
+
+
+if not _HAVE_NUMBA:
+    flood_fill = _flood_fill_np
+    box_blur = _box_blur_np
+
+
+@njit(cache=True)
+def midpoint_ellipse(arr, cx, cy, rx, ry, color):
+    """Pixelgenaue Ellipse (Mittelpunkt-Algorithmus) in den uint32-Puffer"""
+    height, width = arr.shape
+    rx2 = rx * rx
+    ry2 = ry * ry
+    tworx2 = 2 * rx2
+    twory2 = 2 * ry2
+
+    x = 0
+    y = ry
+    px = 0
+    py = tworx2 * y
+
+    _plot_ellipse_points(arr, cx, cy, x, y, color, width, height)
+
+    # Region 1
+    p = round(ry2 - (rx2 * ry) + (0.25 * rx2))
+    while px < py:
+        x += 1
+        px += twory2
+        if p < 0:
+            p += ry2 + px
+        else:
+            y -= 1
+            py -= tworx2
+            p += ry2 + px - py
+        _plot_ellipse_points(arr, cx, cy, x, y, color, width, height)
+
+    # Region 2
+    p = round(ry2 * (x + 0.5) * (x + 0.5) + rx2 * (y - 1) * (y - 1) - rx2 * ry2)
+    while y > 0:
+        y -= 1
+        py -= tworx2
+        if p > 0:
+            p += rx2 - py
+        else:
+            x += 1
+            px += twory2
+            p += rx2 - py + px
+        _plot_ellipse_points(arr, cx, cy, x, y, color, width, height)
+
+
+@njit(cache=True)
+def _plot_ellipse_points(arr, cx, cy, x, y, color, width, height):
+    """Die vier symmetrischen Ellipsenpunkte setzen"""
+    for px, py in ((cx + x, cy + y), (cx - x, cy + y),
+                   (cx + x, cy - y), (cx - x, cy - y)):
+        if 0 <= px < width and 0 <= py < height:
+            arr[py, px] = color